@@ -10,7 +10,7 @@ from reportlab.lib.colors import HexColor, white, black
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    Spacer, Table, TableStyle,
     PageBreak, KeepTogether, Image
 )
 from reportlab.pdfgen import canvas
@@ -18,8 +18,14 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.graphics.shapes import Drawing, Rect, Line
 from reportlab.graphics import renderPDF
+import io
+import math
 import os
 
+from pdf_images import DEFAULT_DPI, ImageEmbedder, collect_images
+from pdf_korean_wrap import KoreanParagraph
+from pdf_paragraph_cache import ParagraphFactory
+
 # 색상 정의 (파란색 계열)
 PRIMARY_BLUE = HexColor('#1E40AF')      # 진한 파란색
 SECONDARY_BLUE = HexColor('#3B82F6')    # 밝은 파란색
@@ -61,6 +67,28 @@ def register_fonts():
 
 FONT_NAME = register_fonts()
 
+# 반복되는 마크업(불릿, 통계 박스 등)의 파싱 결과 재사용, 줄바꿈은 한국어 규칙(어절 단위 + 금칙)
+cached_paragraph = ParagraphFactory(max_entries=4096, paragraph_class=KoreanParagraph)
+
+OUTPUT_PATH = "C:/a/docs/오늘의마사지_사업계획서.pdf"
+SECTION_CACHE_DIR = "C:/a/docs/.section_cache"
+
+# 본문 문서 설정
+DOC_OPTIONS = dict(
+    pagesize=A4,
+    topMargin=25*mm,
+    bottomMargin=20*mm,
+    leftMargin=20*mm,
+    rightMargin=20*mm
+)
+
+# 목차 페이지 레이아웃 (페이지당 항목 수가 고정이라 목차 쪽수를 미리 알 수 있음)
+TOC_ENTRIES_PER_PAGE = 40
+TOC_LINE_HEIGHT = 5.5*mm
+
+# 부록 이미지 최대 인쇄 크기 (본문 프레임 안, 캡션 자리 제외)
+APPENDIX_IMAGE_BOX = (170*mm, 200*mm)
+
 # 스타일 정의
 def get_styles():
     styles = getSampleStyleSheet()
@@ -276,24 +304,6 @@ def add_page_header_footer(c, doc, page_num):
     c.drawCentredString(width/2, 8*mm, f"- {page_num} -")
     c.drawRightString(width - 20*mm, 8*mm, "CONFIDENTIAL")
 
-class NumberedCanvas(canvas.Canvas):
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
-
-    def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self._saved_page_states)
-        for i, state in enumerate(self._saved_page_states):
-            self.__dict__.update(state)
-            if i > 0:  # 표지 제외
-                add_page_header_footer(self, None, i)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
 def create_table(data, col_widths, header=True):
     """표 생성 헬퍼"""
     table = Table(data, colWidths=col_widths)
@@ -334,7 +344,7 @@ def create_table(data, col_widths, header=True):
 
 def create_highlight_box(content, styles, box_color=LIGHT_BLUE):
     """하이라이트 박스 생성"""
-    data = [[Paragraph(content, styles['BoxText'])]]
+    data = [[cached_paragraph(content, styles['BoxText'])]]
     table = Table(data, colWidths=[160*mm])
     table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, -1), box_color),
@@ -351,8 +361,8 @@ def create_stat_boxes(items, styles):
     cells = []
     for value, label in items:
         cell_content = [
-            Paragraph(f'<font size="24" color="{PRIMARY_BLUE.hexval()}">{value}</font>', styles['BigNumber']),
-            Paragraph(label, styles['NumberLabel'])
+            cached_paragraph(f'<font size="24" color="{PRIMARY_BLUE.hexval()}">{value}</font>', styles['BigNumber']),
+            cached_paragraph(label, styles['NumberLabel'])
         ]
         cells.append(cell_content)
 
@@ -376,9 +386,9 @@ def build_content(styles):
     story = []
 
     # ===== 페이지 1: 사업 요약 =====
-    story.append(Paragraph("1. 한눈에 보는 사업 요약", styles['SectionTitle']))
+    story.append(cached_paragraph("1. 한눈에 보는 사업 요약", styles['SectionTitle']))
 
-    story.append(Paragraph(
+    story.append(cached_paragraph(
         '<b>"배달의민족"의 마사지 버전</b> - 고객과 매장을 연결하는 예약 중개 플랫폼',
         styles['Highlight']
     ))
@@ -406,11 +416,11 @@ def build_content(styles):
     story.append(Spacer(1, 8*mm))
 
     # 우리가 하는 일
-    story.append(Paragraph("우리가 하는 일", styles['SubsectionTitle']))
+    story.append(cached_paragraph("우리가 하는 일", styles['SubsectionTitle']))
     for item in ["고객과 매장을 <b>연결</b>해주는 플랫폼",
                  "예약, 결제, 채팅, 리뷰 등 <b>모든 것을 앱으로</b>",
                  "매장은 <b>100% 무료로 입점</b>, 예약 시에만 수수료 지불"]:
-        story.append(Paragraph(f"• {item}", styles['BulletPoint']))
+        story.append(cached_paragraph(f"• {item}", styles['BulletPoint']))
 
     story.append(Spacer(1, 5*mm))
     story.append(create_highlight_box(
@@ -421,10 +431,10 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 2: 시장 기회 =====
-    story.append(Paragraph("2. 왜 이 사업인가? (시장 기회)", styles['SectionTitle']))
+    story.append(cached_paragraph("2. 왜 이 사업인가? (시장 기회)", styles['SectionTitle']))
 
     # 시장 현황
-    story.append(Paragraph("2.1 시장 현황", styles['SubsectionTitle']))
+    story.append(cached_paragraph("2.1 시장 현황", styles['SubsectionTitle']))
     market_data = [
         ["지표", "수치"],
         ["국내 마사지/스파 시장", "2조원"],
@@ -436,18 +446,18 @@ def build_content(styles):
     story.append(Spacer(1, 8*mm))
 
     # 왜 지금인가
-    story.append(Paragraph("2.2 왜 지금인가?", styles['SubsectionTitle']))
+    story.append(cached_paragraph("2.2 왜 지금인가?", styles['SubsectionTitle']))
     for item in [
         "코로나 이후 <b>비대면 예약</b> 습관화",
         "기존 플랫폼들의 <b>높은 월정액</b>에 매장들 불만",
         "MZ세대의 <b>앱 예약 선호</b>",
         "아직 <b>독점 플랫폼이 없음</b>"
     ]:
-        story.append(Paragraph(f"• {item}", styles['BulletPoint']))
+        story.append(cached_paragraph(f"• {item}", styles['BulletPoint']))
     story.append(Spacer(1, 8*mm))
 
     # 경쟁사 비교
-    story.append(Paragraph("2.3 경쟁사 비교", styles['SubsectionTitle']))
+    story.append(cached_paragraph("2.3 경쟁사 비교", styles['SubsectionTitle']))
     compare_data = [
         ["항목", "마사지통", "힐리/하이타이", "오늘의마사지"],
         ["월정액", "최대 33만원", "10-20만원", "0원 (완전 무료)"],
@@ -460,7 +470,7 @@ def build_content(styles):
     story.append(Spacer(1, 8*mm))
 
     # 핵심 차별점
-    story.append(Paragraph("2.4 우리만의 핵심 차별점", styles['SubsectionTitle']))
+    story.append(cached_paragraph("2.4 우리만의 핵심 차별점", styles['SubsectionTitle']))
     diff_data = [
         ["차별점", "설명"],
         ["1. 100% 무료 입점", "월정액 0원, 입점비 0원 → 경쟁사 대비 연 400만원 절감"],
@@ -473,9 +483,9 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 3: 수익 모델 =====
-    story.append(Paragraph("3. 어떻게 돈을 버나요? (수익 모델)", styles['SectionTitle']))
+    story.append(cached_paragraph("3. 어떻게 돈을 버나요? (수익 모델)", styles['SectionTitle']))
 
-    story.append(Paragraph("3.1 수익 구조", styles['SubsectionTitle']))
+    story.append(cached_paragraph("3.1 수익 구조", styles['SubsectionTitle']))
 
     # 수익 구조 플로우
     flow_data = [
@@ -489,7 +499,7 @@ def build_content(styles):
     story.append(Spacer(1, 8*mm))
 
     # 수익원 종류
-    story.append(Paragraph("3.2 수익원 종류", styles['SubsectionTitle']))
+    story.append(cached_paragraph("3.2 수익원 종류", styles['SubsectionTitle']))
     revenue_data = [
         ["수익원", "비중", "설명", "시작 시점"],
         ["예약 수수료", "85%", "핵심 수익 (6.5%)", "출시 즉시"],
@@ -510,7 +520,7 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 4: 비용 =====
-    story.append(Paragraph("4. 돈이 얼마나 들어가나요? (운영 비용)", styles['SectionTitle']))
+    story.append(cached_paragraph("4. 돈이 얼마나 들어가나요? (운영 비용)", styles['SectionTitle']))
 
     story.append(create_highlight_box(
         '<b>참고:</b> 개발은 이미 96% 완료되어 있습니다. 아래는 <b>출시 후 실제 발생하는 비용</b>만 정리했습니다.',
@@ -518,7 +528,7 @@ def build_content(styles):
     ))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("4.1 월간 운영 비용", styles['SubsectionTitle']))
+    story.append(cached_paragraph("4.1 월간 운영 비용", styles['SubsectionTitle']))
     cost_data = [
         ["항목", "월 비용", "연 비용", "설명"],
         ["서버 (Vercel + Supabase)", "50만원", "600만원", "트래픽 따라 증가"],
@@ -530,7 +540,7 @@ def build_content(styles):
     story.append(create_table(cost_data, [50*mm, 30*mm, 30*mm, 50*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("4.2 마케팅 비용 (1년차)", styles['SubsectionTitle']))
+    story.append(cached_paragraph("4.2 마케팅 비용 (1년차)", styles['SubsectionTitle']))
     marketing_data = [
         ["항목", "월 비용", "연 비용", "설명"],
         ["신규가입 쿠폰", "250만원", "3,000만원", "5천원 × 2장 × 5만명"],
@@ -552,9 +562,9 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 5: 수익 전망 =====
-    story.append(Paragraph("5. 얼마나 벌 수 있나요? (5개년 수익 전망)", styles['SectionTitle']))
+    story.append(cached_paragraph("5. 얼마나 벌 수 있나요? (5개년 수익 전망)", styles['SectionTitle']))
 
-    story.append(Paragraph("5.1 핵심 가정", styles['SubsectionTitle']))
+    story.append(cached_paragraph("5.1 핵심 가정", styles['SubsectionTitle']))
     assumption_data = [
         ["항목", "값"],
         ["평균 객단가", "60,000원"],
@@ -565,7 +575,7 @@ def build_content(styles):
     story.append(create_table(assumption_data, [60*mm, 100*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("5.2 5개년 수익 시뮬레이션", styles['SubsectionTitle']))
+    story.append(cached_paragraph("5.2 5개년 수익 시뮬레이션", styles['SubsectionTitle']))
     profit_data = [
         ["연차", "점유율", "매장 수", "고객 수", "연 GMV", "세후순이익"],
         ["1년차", "5%", "1,000개", "5만명", "288억", "13.5억"],
@@ -578,7 +588,7 @@ def build_content(styles):
     story.append(Spacer(1, 8*mm))
 
     # 누적 순이익
-    story.append(Paragraph("5.3 누적 순이익", styles['SubsectionTitle']))
+    story.append(cached_paragraph("5.3 누적 순이익", styles['SubsectionTitle']))
     story.append(create_stat_boxes([
         ("69.5억", "2년차 누적"),
         ("167.5억", "3년차 누적"),
@@ -598,9 +608,9 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 6: 매장 혜택 =====
-    story.append(Paragraph("6. 매장(사장님)이 왜 가입해야 하나요?", styles['SectionTitle']))
+    story.append(cached_paragraph("6. 매장(사장님)이 왜 가입해야 하나요?", styles['SectionTitle']))
 
-    story.append(Paragraph("6.1 매장 입장에서의 핵심 혜택", styles['SubsectionTitle']))
+    story.append(cached_paragraph("6.1 매장 입장에서의 핵심 혜택", styles['SubsectionTitle']))
     benefit_data = [
         ["문제 (현재)", "해결책 (오늘의마사지)"],
         ["마통 최대 월 33만원 부담", "월정액 0원 (완전 무료)"],
@@ -612,7 +622,7 @@ def build_content(styles):
     story.append(create_table(benefit_data, [80*mm, 80*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("6.2 PASS 본인인증의 위력", styles['SubsectionTitle']))
+    story.append(cached_paragraph("6.2 PASS 본인인증의 위력", styles['SubsectionTitle']))
     pass_data = [
         ["기존 플랫폼", "오늘의마사지"],
         ["전화번호만으로 가입", "PASS 본인인증 필수"],
@@ -623,7 +633,7 @@ def build_content(styles):
     story.append(create_table(pass_data, [80*mm, 80*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("6.3 고객 점수 시스템", styles['SubsectionTitle']))
+    story.append(cached_paragraph("6.3 고객 점수 시스템", styles['SubsectionTitle']))
     score_data = [
         ["행동", "점수 변화"],
         ["기본 점수", "100점"],
@@ -645,9 +655,9 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 7: 마케팅 & 리스크 =====
-    story.append(Paragraph("7. 고객은 어떻게 모으나요? (마케팅 전략)", styles['SectionTitle']))
+    story.append(cached_paragraph("7. 고객은 어떻게 모으나요? (마케팅 전략)", styles['SectionTitle']))
 
-    story.append(Paragraph("7.1 신규가입 혜택", styles['SubsectionTitle']))
+    story.append(cached_paragraph("7.1 신규가입 혜택", styles['SubsectionTitle']))
     story.append(create_highlight_box(
         '<b>신규가입 시 5,000원 쿠폰 2장 지급!</b><br/>'
         '• 쿠폰 1: 5,000원 (7일 한정)<br/>'
@@ -657,7 +667,7 @@ def build_content(styles):
     ))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("7.2 마케팅 전략", styles['SubsectionTitle']))
+    story.append(cached_paragraph("7.2 마케팅 전략", styles['SubsectionTitle']))
     strategy_data = [
         ["전략", "예상 비용", "기대 효과"],
         ["신규가입 쿠폰", "5천원 × 2장", "첫 경험 + 재방문 유도"],
@@ -669,9 +679,9 @@ def build_content(styles):
     story.append(create_table(strategy_data, [50*mm, 50*mm, 60*mm]))
     story.append(Spacer(1, 10*mm))
 
-    story.append(Paragraph("8. 리스크는 없나요?", styles['SectionTitle']))
+    story.append(cached_paragraph("8. 리스크는 없나요?", styles['SectionTitle']))
 
-    story.append(Paragraph("8.1 비즈니스 리스크", styles['SubsectionTitle']))
+    story.append(cached_paragraph("8.1 비즈니스 리스크", styles['SubsectionTitle']))
     risk_data = [
         ["리스크", "가능성", "대응 방안"],
         ["경쟁사 무료화", "낮음", "이미 월정액 모델로 수익 중 (전환 어려움)"],
@@ -682,7 +692,7 @@ def build_content(styles):
     story.append(create_table(risk_data, [45*mm, 25*mm, 90*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("8.2 우리만의 보호 장치", styles['SubsectionTitle']))
+    story.append(cached_paragraph("8.2 우리만의 보호 장치", styles['SubsectionTitle']))
     for item in [
         "PASS 본인인증 → 성별 확인 + 신원 확인",
         "신용점수 시스템 → 진상고객 자동 퇴출",
@@ -691,24 +701,24 @@ def build_content(styles):
         "DI 기반 블랙리스트 → 재가입 불가",
         "프리미엄 구독 → 진상에게 매장 비노출"
     ]:
-        story.append(Paragraph(f"• {item}", styles['BulletPoint']))
+        story.append(cached_paragraph(f"• {item}", styles['BulletPoint']))
 
     story.append(PageBreak())
 
     # ===== 페이지 8: 투자 & 로드맵 =====
-    story.append(Paragraph("9. 왜 지금 투자해야 하나요?", styles['SectionTitle']))
+    story.append(cached_paragraph("9. 왜 지금 투자해야 하나요?", styles['SectionTitle']))
 
-    story.append(Paragraph("9.1 타이밍", styles['SubsectionTitle']))
+    story.append(cached_paragraph("9.1 타이밍", styles['SubsectionTitle']))
     for item in [
         "<b>개발 96% 완료</b> → 추가 개발비 거의 없음",
         "<b>시장 성장 중</b> → 아직 독점자 없음",
         "<b>경쟁사 불만 高</b> → 매장 이탈 수요 존재",
         "<b>즉시 출시 가능</b> → 4주 내 런칭 가능"
     ]:
-        story.append(Paragraph(f"• {item}", styles['BulletPoint']))
+        story.append(cached_paragraph(f"• {item}", styles['BulletPoint']))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("9.2 투자 대비 리턴", styles['SubsectionTitle']))
+    story.append(cached_paragraph("9.2 투자 대비 리턴", styles['SubsectionTitle']))
     roi_data = [
         ["항목", "금액"],
         ["1년차 필요 자금", "약 1.4억원"],
@@ -719,7 +729,7 @@ def build_content(styles):
     story.append(create_table(roi_data, [80*mm, 80*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("9.3 Exit 시나리오", styles['SubsectionTitle']))
+    story.append(cached_paragraph("9.3 Exit 시나리오", styles['SubsectionTitle']))
     exit_data = [
         ["시나리오", "예상 가치"],
         ["5년 운영 후 매각", "순이익 10배 = 2,000억+"],
@@ -729,9 +739,9 @@ def build_content(styles):
     story.append(create_table(exit_data, [70*mm, 90*mm]))
     story.append(Spacer(1, 10*mm))
 
-    story.append(Paragraph("10. 실행 로드맵", styles['SectionTitle']))
+    story.append(cached_paragraph("10. 실행 로드맵", styles['SectionTitle']))
 
-    story.append(Paragraph("10.1 출시 전 (4주)", styles['SubsectionTitle']))
+    story.append(cached_paragraph("10.1 출시 전 (4주)", styles['SubsectionTitle']))
     roadmap_data = [
         ["주차", "할 일", "담당"],
         ["1주", "본인인증 연동 완료", "개발팀"],
@@ -743,7 +753,7 @@ def build_content(styles):
     story.append(create_table(roadmap_data, [30*mm, 80*mm, 50*mm]))
     story.append(Spacer(1, 8*mm))
 
-    story.append(Paragraph("10.2 성장 로드맵", styles['SubsectionTitle']))
+    story.append(cached_paragraph("10.2 성장 로드맵", styles['SubsectionTitle']))
     growth_data = [
         ["연차", "목표", "주요 활동"],
         ["1년차", "1,000개 매장, 5만 고객", "매장 확보 집중 (무료 입점 홍보)"],
@@ -756,9 +766,9 @@ def build_content(styles):
     story.append(PageBreak())
 
     # ===== 페이지 9: 핵심 요약 =====
-    story.append(Paragraph("11. 핵심 요약: 왜 이 사업인가?", styles['SectionTitle']))
+    story.append(cached_paragraph("11. 핵심 요약: 왜 이 사업인가?", styles['SectionTitle']))
 
-    story.append(Paragraph("경쟁 우위 5가지", styles['SubsectionTitle']))
+    story.append(cached_paragraph("경쟁 우위 5가지", styles['SubsectionTitle']))
     advantage_data = [
         ["#", "차별점", "효과"],
         ["1", "100% 무료 입점", "경쟁사 대비 연 400만원 절감"],
@@ -770,7 +780,7 @@ def build_content(styles):
     story.append(create_table(advantage_data, [15*mm, 50*mm, 95*mm]))
     story.append(Spacer(1, 10*mm))
 
-    story.append(Paragraph("5년 후 우리의 모습", styles['SubsectionTitle']))
+    story.append(cached_paragraph("5년 후 우리의 모습", styles['SubsectionTitle']))
 
     # 비전 박스
     vision_content = '''
@@ -780,7 +790,7 @@ def build_content(styles):
     <b>연 순이익 196억원+</b><br/>
     <b>마사지 예약 플랫폼 1위</b>
     '''
-    vision_data = [[Paragraph(vision_content, styles['BoxText'])]]
+    vision_data = [[cached_paragraph(vision_content, styles['BoxText'])]]
     vision_table = Table(vision_data, colWidths=[160*mm])
     vision_table.setStyle(TableStyle([
         ('BACKGROUND', (0, 0), (-1, -1), PRIMARY_BLUE),
@@ -805,77 +815,192 @@ def build_content(styles):
     story.append(Spacer(1, 10*mm))
 
     # 문의 정보
-    story.append(Paragraph("문의 및 연락처", styles['SubsectionTitle']))
-    story.append(Paragraph("• 작성일: 2026년 1월 31일", styles['BodyText']))
-    story.append(Paragraph("• 문서 목적: 투자 검토용 (CONFIDENTIAL)", styles['BodyText']))
+    story.append(cached_paragraph("문의 및 연락처", styles['SubsectionTitle']))
+    story.append(cached_paragraph("• 작성일: 2026년 1월 31일", styles['BodyText']))
+    story.append(cached_paragraph("• 문서 목적: 투자 검토용 (CONFIDENTIAL)", styles['BodyText']))
     story.append(Spacer(1, 5*mm))
-    story.append(Paragraph(
+    story.append(cached_paragraph(
         "<i>이 문서는 투자 검토용으로 작성되었으며, 실제 수익은 시장 상황에 따라 달라질 수 있습니다.</i>",
         styles['Caption']
     ))
 
     return story
 
-def create_pdf():
-    """PDF 생성 메인 함수"""
-    output_path = "C:/a/docs/오늘의마사지_사업계획서.pdf"
+def build_image_appendix(styles, images, embedder=None):
+    """부록: 화면 캡처 (images: 경로 또는 (경로, 설명) 리스트, 이미지마다 한 페이지)
+
+    레이아웃 전에 모든 이미지를 인쇄 크기에 맞게 병렬 전처리하고,
+    같은 내용의 이미지는 PDF에 한 번만 저장
+    """
+    embedder = embedder or ImageEmbedder()
+    items = [(item, os.path.splitext(os.path.basename(item))[0]) if isinstance(item, str) else tuple(item)
+             for item in images]
+    embedder.prepare([(path, *APPENDIX_IMAGE_BOX) for path, _caption in items])
+
+    story = [PageBreak(), cached_paragraph("부록. 화면 캡처", styles['SectionTitle'])]
+    for i, (path, caption) in enumerate(items):
+        if i:
+            story.append(PageBreak())
+        story.append(embedder.flowable(path, *APPENDIX_IMAGE_BOX))
+        story.append(Spacer(1, 3*mm))
+        story.append(cached_paragraph(caption, styles['Caption']))
+    return story
 
-    # 문서 설정
-    doc = SimpleDocTemplate(
-        output_path,
-        pagesize=A4,
-        topMargin=25*mm,
-        bottomMargin=20*mm,
-        leftMargin=20*mm,
-        rightMargin=20*mm
-    )
+def decorate_content_page(c, page_number):
+    """본문 페이지 헤더/푸터 (page_number: 표지/목차를 포함한 물리 페이지 번호, 목차 번호와 같음)"""
+    add_page_header_footer(c, None, page_number)
 
-    styles = get_styles()
-    story = build_content(styles)
+def render_cover(invariant=None):
+    """표지 페이지 PDF bytes (invariant면 생성 시각/문서 ID 고정, assemble_pdf에서 pypdf로 다시 씀)"""
+    from pdf_sections import binary_streams
 
-    # 표지 페이지 직접 생성
+    buffer = io.BytesIO()
+    width, height = A4
+    with binary_streams():
+        c = canvas.Canvas(buffer, pagesize=A4, invariant=invariant)
+        create_cover_page(c, width, height)
+        c.showPage()
+        c.save()
+    return buffer.getvalue()
+
+def render_toc(headings, first_page):
+    """목차 페이지 PDF bytes
+
+    headings: (단계, 제목, 본문 페이지 인덱스, y) 리스트, first_page: 목차가 들어갈 위치(0부터)
+    목차 쪽수가 항목 수로 정해지므로 쪽 번호(PDF 뷰어와 같은 물리 페이지 번호)를 바로 계산
+    본문 푸터(decorate_content_page)도 같은 물리 페이지 번호를 씀
+    """
     width, height = A4
-    c = canvas.Canvas(output_path, pagesize=A4)
-    create_cover_page(c, width, height)
-    c.showPage()
+    toc_pages = math.ceil(len(headings) / TOC_ENTRIES_PER_PAGE)
+    content_start = first_page + toc_pages + 1
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    for start in range(0, len(headings), TOC_ENTRIES_PER_PAGE):
+        # 제목
+        c.setFillColor(PRIMARY_BLUE)
+        c.setFont(FONT_NAME, 22)
+        c.drawString(20*mm, height - 35*mm, "목차")
+        c.setStrokeColor(LIGHT_BLUE)
+        c.setLineWidth(2)
+        c.line(20*mm, height - 40*mm, width - 20*mm, height - 40*mm)
+
+        y = height - 52*mm
+        for level, title, page, _top in headings[start:start + TOC_ENTRIES_PER_PAGE]:
+            x = 20*mm + level * 8*mm
+            size = 11 if level == 0 else 9.5
+            c.setFillColor(DARK_BLUE if level == 0 else TEXT_DARK)
+            c.setFont(FONT_NAME, size)
+            c.drawString(x, y, title)
+            page_label = str(content_start + page)
+            c.drawRightString(width - 20*mm, y, page_label)
+
+            # 점선 리더
+            leader_start = x + pdfmetrics.stringWidth(title, FONT_NAME, size) + 2*mm
+            leader_end = width - 20*mm - pdfmetrics.stringWidth(page_label, FONT_NAME, size) - 2*mm
+            if leader_end > leader_start:
+                c.setStrokeColor(TEXT_GRAY)
+                c.setLineWidth(0.5)
+                c.setDash(1, 2)
+                c.line(leader_start, y + 1, leader_end, y + 1)
+                c.setDash()
+            y -= TOC_LINE_HEIGHT
+        c.showPage()
     c.save()
-
-    # 본문 생성 (표지 뒤에 추가)
-    from pypdf import PdfReader, PdfWriter
-
-    # 본문 PDF 생성
-    temp_content_path = "C:/a/docs/temp_content.pdf"
-    doc_content = SimpleDocTemplate(
-        temp_content_path,
-        pagesize=A4,
-        topMargin=25*mm,
-        bottomMargin=20*mm,
-        leftMargin=20*mm,
-        rightMargin=20*mm
-    )
-    doc_content.build(story, canvasmaker=NumberedCanvas)
-
-    # PDF 병합
-    writer = PdfWriter()
-
-    # 표지 추가
-    cover_reader = PdfReader(output_path)
-    writer.add_page(cover_reader.pages[0])
-
-    # 본문 추가
-    content_reader = PdfReader(temp_content_path)
-    for page in content_reader.pages:
-        writer.add_page(page)
-
-    # 최종 저장
+    return buffer.getvalue()
+
+def render_pdf(content=None, stream=None, cover=True, doc_options=None,
+               decorate_page=decorate_content_page, cache_dir=None, workers=1, stats=None,
+               reproducible=False, toc=True):
+    """메모리에서 PDF 생성 -> bytes (stream을 주면 stream에 기록하고 stream 반환)
+
+    content: flowable 리스트, 또는 styles를 받아 story를 만드는 함수 (기본 build_content)
+    cover: True면 기본 표지, bytes면 해당 PDF를 표지로, False/None이면 표지 없음
+    cache_dir를 주지 않으면 디스크에 아무것도 쓰지 않으며, 호출마다 스타일을
+    새로 만들고 공유 상태를 바꾸지 않으므로 여러 스레드/프로세스에서 동시에 호출 가능
+    (예외: 렌더링 중에는 rl_config.useA85가 0. pdf_sections.binary_streams가 잠금과
+    참조 수로 관리해 마지막 호출이 끝나면 원래 값으로 돌아옴)
+    reproducible: 시각을 SOURCE_DATE_EPOCH로 고정하고 문서 ID를 내용에서 계산 (같은 입력 -> 같은 bytes)
+    toc: 표지 뒤 목차 페이지 추가 여부 (북마크는 항상 추가)
+    """
+    from pdf_sections import SectionCache, split_sections, render_sections, assemble_pdf
+
+    options = dict(DOC_OPTIONS, **(doc_options or {}))
+    if reproducible:
+        # 섹션 PDF(캐시 파일 포함)에도 시각/난수 ID가 들어가지 않도록
+        options['invariant'] = 1
+    if content is None:
+        content = build_content
+    story = content(get_styles()) if callable(content) else list(content)
+    sections = split_sections(story)
+
+    # 섹션별 렌더링 (캐시가 있으면 내용이 바뀐 섹션만 다시 레이아웃)
+    cache = SectionCache(cache_dir) if cache_dir else None
+    rendered, hits = render_sections(sections, options, cache, workers)
+    if stats is not None:
+        stats.update(sections=len(sections), cached_sections=hits,
+                     pages=sum(meta['page_count'] for _data, meta in rendered),
+                     headings=sum(len(meta['headings']) for _data, meta in rendered))
+
+    # 표지 + 목차 + 섹션 병합, 연속 페이지 번호로 헤더/푸터 적용, 북마크 추가
+    cover_pdf = render_cover(invariant=1 if reproducible else None) if cover is True else (cover or None)
+    return assemble_pdf(cover_pdf, rendered, decorate_page, options['pagesize'], output=stream,
+                        reproducible=reproducible, toc=render_toc if toc else None)
+
+def iter_pdf(content=None, chunk_size=64 * 1024, **options):
+    """render_pdf 결과를 chunk_size 단위 bytes로 나눠 반환 (HTTP 스트리밍 응답용)"""
+    data = memoryview(render_pdf(content, **options))
+    for offset in range(0, len(data), chunk_size):
+        yield bytes(data[offset:offset + chunk_size])
+
+def create_pdf(output_path=OUTPUT_PATH, cache_dir=SECTION_CACHE_DIR, workers=1, reproducible=None,
+               appendix_images=None, image_dpi=DEFAULT_DPI):
+    """PDF 생성 메인 함수 (workers > 1이면 섹션 레이아웃을 병렬 처리)
+
+    reproducible을 지정하지 않으면 SOURCE_DATE_EPOCH 환경 변수가 있을 때 재현 가능 모드
+    appendix_images: 부록에 넣을 이미지 파일/디렉터리 목록 (image_dpi 기준으로 줄여서 삽입)
+    """
+    if reproducible is None:
+        reproducible = "SOURCE_DATE_EPOCH" in os.environ
+    content = build_content
+    embedder = None
+    if appendix_images:
+        embedder = ImageEmbedder(dpi=image_dpi)
+        images = collect_images(appendix_images)
+        content = lambda styles: build_content(styles) + build_image_appendix(styles, images, embedder)
+
+    stats = {}
     with open(output_path, "wb") as f:
-        writer.write(f)
+        render_pdf(content, stream=f, cache_dir=cache_dir, workers=workers, stats=stats, reproducible=reproducible)
 
-    # 임시 파일 삭제
-    os.remove(temp_content_path)
+    if embedder:
+        image_stats = embedder.stats()
+        print(f"부록 이미지: {image_stats['requests']}개 (고유 {image_stats['unique_images']}개), "
+              f"원본 {image_stats['source_bytes']:,}B -> {image_stats['embedded_bytes']:,}B")
 
+    print(f"섹션 캐시: 재사용 {stats['cached_sections']} / 새로 렌더링 {stats['sections'] - stats['cached_sections']}")
     print(f"PDF 생성 완료: {output_path}")
     return output_path
 
 if __name__ == "__main__":
-    create_pdf()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="오늘의마사지 사업 계획서 PDF 생성")
+    parser.add_argument("--workers", type=int, default=1, help="섹션 병렬 레이아웃 프로세스 수")
+    parser.add_argument("--profile", metavar="JSON", help="PDF 대신 flowable별 레이아웃 프로파일 저장")
+    parser.add_argument("--reproducible", action="store_true", default=None,
+                        help="시각/문서 ID 고정 (SOURCE_DATE_EPOCH가 있으면 기본 적용)")
+    parser.add_argument("--appendix-images", nargs="+", metavar="PATH", help="부록에 넣을 이미지 파일/디렉터리")
+    parser.add_argument("--image-dpi", type=int, default=DEFAULT_DPI, help="부록 이미지 목표 해상도")
+    args = parser.parse_args()
+
+    if args.profile:
+        import sys
+        from pdf_profile import profile_pdf, print_report, write_report
+
+        report = profile_pdf(sys.modules[__name__])
+        print_report(report)
+        write_report(report, args.profile)
+    else:
+        create_pdf(workers=args.workers, reproducible=args.reproducible,
+                   appendix_images=args.appendix_images, image_dpi=args.image_dpi)
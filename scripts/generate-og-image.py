@@ -5,23 +5,77 @@ Generates a 1200x630px PNG image with gradient background and Korean text.
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import argparse
+import io
 import os
+import struct
+import time
+
+OUTPUT_PATH = "C:/a/public/og-image.png"
+POSTER_OUTPUT_PATH = "C:/a/docs/poster-a1.png"
+
+# Image dimensions
+WIDTH = 1200
+HEIGHT = 630
+# A1 (594x841mm) at 300 DPI
+POSTER_SIZE = (7016, 9933)
+POSTER_DPI = 300
+STRIP_HEIGHT = 64
+
+# Colors
+PINK = (255, 182, 193)      # Light pink
+PURPLE = (147, 112, 219)    # Medium purple
+WHITE = (255, 255, 255)
+ACCENT_COLOR = (255, 255, 255, 50)
+
+MAIN_TEXT = "오늘의마사지"
+SUBTITLE_TEXT = "내 주변 마사지샵 예약"
+
+# Try to use system fonts that support Korean
+# Common Korean fonts on Windows
+KOREAN_FONTS = [
+    'C:/Windows/Fonts/malgun.ttf',      # Malgun Gothic
+    'C:/Windows/Fonts/malgunbd.ttf',    # Malgun Gothic Bold
+    'C:/Windows/Fonts/gulim.ttc',       # Gulim
+    'C:/Windows/Fonts/batang.ttc',      # Batang
+    '/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf',  # Linux
+    '/System/Library/Fonts/AppleSDGothicNeo.ttc',  # macOS
+]
+
+# Ancillary chunks that carry timestamps or free-form text
+NONDETERMINISTIC_CHUNKS = {b'tIME', b'tEXt', b'zTXt', b'iTXt'}
+
+
+def strip_png_metadata(data):
+    """Remove timestamp/text chunks from PNG bytes so identical pixels give identical files."""
+    signature = data[:8]
+    if signature != b'\x89PNG\r\n\x1a\n':
+        raise ValueError("Not a PNG file")
+    chunks = [signature]
+    offset = 8
+    while offset < len(data):
+        length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+        end = offset + 12 + length  # length + type + data + CRC
+        if chunk_type not in NONDETERMINISTIC_CHUNKS:
+            chunks.append(data[offset:end])
+        offset = end
+    return b''.join(chunks)
+
+
+def gradient_strip(width, height, top, bottom, start_color, end_color):
+    """Rows top..bottom of a vertical gradient spanning the full image height."""
+    base = Image.new('RGB', (width, bottom - top), start_color)
+    overlay = Image.new('RGB', (width, bottom - top), end_color)
+    # One alpha value per row, stretched across the width
+    mask = Image.new('L', (1, bottom - top))
+    mask.putdata([int(255 * (y / height)) for y in range(top, bottom)])
+    base.paste(overlay, (0, 0), mask.resize((width, bottom - top), Image.NEAREST))
+    return base
 
 
 def create_gradient(width, height, start_color, end_color):
     """Create a vertical gradient image."""
-    base = Image.new('RGB', (width, height), start_color)
-    top = Image.new('RGB', (width, height), end_color)
-    mask = Image.new('L', (width, height))
-    mask_data = []
-
-    for y in range(height):
-        alpha = int(255 * (y / height))
-        mask_data.extend([alpha] * width)
-
-    mask.putdata(mask_data)
-    base.paste(top, (0, 0), mask)
-    return base
+    return gradient_strip(width, height, 0, height, start_color, end_color)
 
 
 def add_text_with_shadow(draw, text, position, font, text_color, shadow_color, shadow_offset=3):
@@ -33,109 +87,101 @@ def add_text_with_shadow(draw, text, position, font, text_color, shadow_color, s
     draw.text((x, y), text, font=font, fill=text_color)
 
 
-def generate_og_image():
-    """Generate the OG image for 오늘의마사지 platform."""
-    # Image dimensions
-    WIDTH = 1200
-    HEIGHT = 630
-
-    # Colors
-    PINK = (255, 182, 193)      # Light pink
-    PURPLE = (147, 112, 219)    # Medium purple
-    WHITE = (255, 255, 255)
-    SHADOW = (0, 0, 0, 100)
-
-    # Create gradient background (pink to purple)
-    img = create_gradient(WIDTH, HEIGHT, PINK, PURPLE)
-    draw = ImageDraw.Draw(img, 'RGBA')
-
-    # Try to use system fonts that support Korean
-    # Common Korean fonts on Windows
-    korean_fonts = [
-        'C:/Windows/Fonts/malgun.ttf',      # Malgun Gothic
-        'C:/Windows/Fonts/malgunbd.ttf',    # Malgun Gothic Bold
-        'C:/Windows/Fonts/gulim.ttc',       # Gulim
-        'C:/Windows/Fonts/batang.ttc',      # Batang
-        '/usr/share/fonts/truetype/nanum/NanumGothicBold.ttf',  # Linux
-        '/System/Library/Fonts/AppleSDGothicNeo.ttc',  # macOS
-    ]
-
-    # Find available font
-    main_font = None
-    subtitle_font = None
-
-    for font_path in korean_fonts:
+def load_fonts(scale=1.0):
+    """Title and subtitle fonts (first available Korean font), sized for the given scale."""
+    main_size, subtitle_size = round(120 * scale), round(50 * scale)
+    for font_path in KOREAN_FONTS:
         if os.path.exists(font_path):
             try:
-                main_font = ImageFont.truetype(font_path, 120)
-                subtitle_font = ImageFont.truetype(font_path, 50)
+                main_font = ImageFont.truetype(font_path, main_size)
+                subtitle_font = ImageFont.truetype(font_path, subtitle_size)
                 print(f"Using font: {font_path}")
-                break
+                return main_font, subtitle_font
             except Exception as e:
                 print(f"Error loading {font_path}: {e}")
                 continue
 
     # Fallback to default font if no Korean font found
-    if main_font is None:
-        print("Warning: No Korean font found. Using default font.")
-        main_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
+    print("Warning: No Korean font found. Using default font.")
+    if scale != 1.0:
+        try:
+            return ImageFont.load_default(main_size), ImageFont.load_default(subtitle_size)
+        except TypeError:  # Pillow < 10.1 has no sized default font
+            pass
+    return ImageFont.load_default(), ImageFont.load_default()
+
 
-    # Main text: "오늘의마사지"
-    main_text = "오늘의마사지"
+def compute_layout(width, height, main_font, subtitle_font, scale=1.0):
+    """Positions of the title, subtitle and corner accents (the OG image is scale 1 at 1200x630)."""
+    measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
 
-    # Get text bounding box for centering
-    main_bbox = draw.textbbox((0, 0), main_text, font=main_font)
+    # Main text centered, slightly above the middle
+    main_bbox = measure.textbbox((0, 0), MAIN_TEXT, font=main_font)
     main_width = main_bbox[2] - main_bbox[0]
     main_height = main_bbox[3] - main_bbox[1]
+    main_x = (width - main_width) // 2
+    main_y = (height - main_height) // 2 - round(50 * scale)
 
-    main_x = (WIDTH - main_width) // 2
-    main_y = (HEIGHT - main_height) // 2 - 50
+    # Subtitle centered below the main text
+    subtitle_bbox = measure.textbbox((0, 0), SUBTITLE_TEXT, font=subtitle_font)
+    subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
+    subtitle_x = (width - subtitle_width) // 2
+    subtitle_y = main_y + main_height + round(40 * scale)
+
+    texts = []
+    for text, position, font, shadow_color, shadow_offset in (
+        (MAIN_TEXT, (main_x, main_y), main_font, (0, 0, 0, 150), round(5 * scale)),
+        (SUBTITLE_TEXT, (subtitle_x, subtitle_y), subtitle_font, (0, 0, 0, 120), round(3 * scale)),
+    ):
+        # Rows covered by the glyphs and their shadow, to skip strips without text
+        bbox = measure.textbbox(position, text, font=font)
+        texts.append((text, position, font, shadow_color, shadow_offset, (bbox[1], bbox[3] + shadow_offset)))
+
+    inset, diameter = round(20 * scale), round(60 * scale)
+    accents = [
+        [inset, inset, inset + diameter, inset + diameter],  # top-left
+        [width - inset - diameter, height - inset - diameter, width - inset, height - inset],  # bottom-right
+    ]
+    return {'texts': texts, 'accents': accents}
 
-    # Draw main text with shadow
-    add_text_with_shadow(
-        draw,
-        main_text,
-        (main_x, main_y),
-        main_font,
-        WHITE,
-        (0, 0, 0, 150),
-        shadow_offset=5
-    )
 
-    # Subtitle: "내 주변 마사지샵 예약"
-    subtitle_text = "내 주변 마사지샵 예약"
+def render_strip(width, height, top, bottom, layout):
+    """Rows top..bottom of the OG design; every strip matches the same rows of a full-frame render."""
+    strip = gradient_strip(width, height, top, bottom, PINK, PURPLE)
+    draw = ImageDraw.Draw(strip, 'RGBA')
 
-    subtitle_bbox = draw.textbbox((0, 0), subtitle_text, font=subtitle_font)
-    subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
+    for text, (x, y), font, shadow_color, shadow_offset, (ink_top, ink_bottom) in layout['texts']:
+        if ink_bottom >= top and ink_top < bottom:
+            add_text_with_shadow(draw, text, (x, y - top), font, WHITE, shadow_color, shadow_offset)
 
-    subtitle_x = (WIDTH - subtitle_width) // 2
-    subtitle_y = main_y + main_height + 40
+    # Decorative circles on the corners
+    for left, upper, right, lower in layout['accents']:
+        if lower >= top and upper < bottom:
+            draw.ellipse([left, upper - top, right, lower - top], fill=ACCENT_COLOR)
+    return strip
 
-    # Draw subtitle with shadow
-    add_text_with_shadow(
-        draw,
-        subtitle_text,
-        (subtitle_x, subtitle_y),
-        subtitle_font,
-        WHITE,
-        (0, 0, 0, 120),
-        shadow_offset=3
-    )
 
-    # Add decorative elements (optional rounded corners on corners)
-    corner_radius = 20
-    corner_color = (255, 255, 255, 50)
+def generate_og_image(output_path=OUTPUT_PATH, reproducible=None):
+    """Generate the OG image for 오늘의마사지 platform.
 
-    # Top-left corner accent
-    draw.ellipse([20, 20, 80, 80], fill=corner_color)
+    In reproducible mode (default when SOURCE_DATE_EPOCH is set) the PNG is
+    written without timestamp/text chunks, so the same inputs hash identically.
+    """
+    if reproducible is None:
+        reproducible = 'SOURCE_DATE_EPOCH' in os.environ
 
-    # Bottom-right corner accent
-    draw.ellipse([WIDTH-80, HEIGHT-80, WIDTH-20, HEIGHT-20], fill=corner_color)
+    main_font, subtitle_font = load_fonts()
+    layout = compute_layout(WIDTH, HEIGHT, main_font, subtitle_font)
+    img = render_strip(WIDTH, HEIGHT, 0, HEIGHT, layout)
 
     # Save the image
-    output_path = "C:/a/public/og-image.png"
-    img.save(output_path, 'PNG', quality=95)
+    if reproducible:
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+        with open(output_path, 'wb') as f:
+            f.write(strip_png_metadata(buffer.getvalue()))
+    else:
+        img.save(output_path, 'PNG', quality=95)
     print(f"\n[SUCCESS] OG image successfully generated!")
     print(f"[INFO] Saved to: {output_path}")
     print(f"[INFO] Dimensions: {WIDTH}x{HEIGHT}px")
@@ -143,9 +189,51 @@ def generate_og_image():
     return output_path
 
 
+def generate_poster(output_path=POSTER_OUTPUT_PATH, size=POSTER_SIZE, strip_height=STRIP_HEIGHT, dpi=POSTER_DPI):
+    """Render the OG design as a print poster, one horizontal strip at a time.
+
+    Each strip is filtered and deflated into the PNG as soon as it is drawn, so
+    peak memory is one strip plus the glyph masks regardless of poster size.
+    The streamed PNG has no timestamp chunks, so output is always reproducible.
+    """
+    from png_stream import PngWriter
+
+    width, height = size
+    scale = width / WIDTH
+    main_font, subtitle_font = load_fonts(scale)
+    layout = compute_layout(width, height, main_font, subtitle_font, scale)
+
+    start = time.perf_counter()
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f, PngWriter(f, width, height, 'RGB', dpi=dpi) as png:
+        for top in range(0, height, strip_height):
+            png.write_rows(render_strip(width, height, top, min(top + strip_height, height), layout))
+    os.replace(tmp_path, output_path)
+
+    print(f"\n[SUCCESS] Poster successfully generated!")
+    print(f"[INFO] Saved to: {output_path}")
+    print(f"[INFO] Dimensions: {width}x{height}px at {dpi} DPI, {strip_height}px strips "
+          f"({time.perf_counter() - start:.1f}s, {os.path.getsize(output_path):,} bytes)")
+    return output_path
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the OG image")
+    parser.add_argument("--output", help=f"PNG output path (default: {OUTPUT_PATH}, or {POSTER_OUTPUT_PATH} with --poster)")
+    parser.add_argument("--reproducible", action="store_true", default=None,
+                        help="Strip timestamp/text chunks (default when SOURCE_DATE_EPOCH is set)")
+    parser.add_argument("--poster", action="store_true", help="Render the print poster in strips instead")
+    parser.add_argument("--size", type=int, nargs=2, default=POSTER_SIZE, metavar=("WIDTH", "HEIGHT"),
+                        help="Poster size in pixels (default: A1 at 300 DPI)")
+    parser.add_argument("--strip-height", type=int, default=STRIP_HEIGHT, help="Rows rendered per strip")
+    parser.add_argument("--dpi", type=int, default=POSTER_DPI, help="Poster resolution written to the PNG")
+    args = parser.parse_args()
+
     try:
-        generate_og_image()
+        if args.poster:
+            generate_poster(args.output or POSTER_OUTPUT_PATH, tuple(args.size), args.strip_height, args.dpi)
+        else:
+            generate_og_image(args.output or OUTPUT_PATH, args.reproducible)
     except Exception as e:
         print(f"[ERROR] Error generating OG image: {e}")
         import traceback
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+스크린샷 세트 시각 회귀 비교
+기준 디렉터리와 새 디렉터리의 PNG를 상대 경로로 짝지어 NumPy로 비교
+(BackstopJS bitmaps_reference/bitmaps_test, .playwright-mcp, visual-checks, 생성된 OG/스플래시 이미지)
+
+1. 파일 해시가 같으면 디코딩 없이 통과
+2. 타일(기본 64x64)마다 64비트 해시를 계산해 해시가 같은 타일은 건너뜀
+   (--cache-dir를 주면 파일 해시별 타일 해시를 저장해, 다시 캡처했지만 픽셀이 같은 경우 기준 이미지를 디코딩하지 않음)
+3. 해시가 다른 타일만 픽셀 단위로 비교 (채널 차이가 --threshold 이하면 같은 픽셀로 취급)
+4. 다른 픽셀이 있으면 히트맵 PNG 저장 (허용 범위 안의 차이는 파랑, 넘는 차이는 노랑 -> 빨강)
+
+사용법:
+    python scripts/image_diff.py backstop_data/bitmaps_reference backstop_data/bitmaps_test/20260101-120000 \\
+        --diff-dir visual-checks/diff --report visual-checks/diff.json
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+TILE_SIZE = 64
+# 채널 값(0-255) 차이가 이 값 이하면 같은 픽셀 (안티에일리어싱/색 양자화 잡음)
+DEFAULT_THRESHOLD = 16
+# 다른 픽셀 비율(%)이 이 값을 넘으면 실패 (backstop.json의 misMatchThreshold와 같은 의미)
+DEFAULT_MAX_MISMATCH = 0.1
+DIGEST_VERSION = 1
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def load_rgba(path):
+    """PNG -> (높이, 너비, 4) uint8 배열"""
+    with Image.open(path) as image:
+        return np.asarray(image.convert('RGBA'))
+
+
+@functools.lru_cache(maxsize=None)
+def _tile_weights(tile):
+    # 위치마다 다른 홀수 가중치: 픽셀 하나만 달라도 타일 해시가 반드시 달라짐
+    rng = np.random.default_rng(DIGEST_VERSION)
+    return rng.integers(1, 2**63, size=(tile, tile), dtype=np.uint64) | np.uint64(1)
+
+
+def tile_digests(pixels, tile=TILE_SIZE):
+    """RGBA 배열 -> (타일 행, 타일 열) uint64 해시
+
+    RGBA 픽셀을 uint32 하나로 보고 위치 가중치를 곱해 더함 (mod 2^64).
+    메모리를 이미지 크기만큼 더 쓰지 않도록 타일 한 줄씩 계산
+    """
+    height, width = pixels.shape[:2]
+    rows, cols = -(-height // tile), -(-width // tile)
+    packed = np.ascontiguousarray(pixels).view(np.uint32)[..., 0]
+    weights = _tile_weights(tile)[:, None, :]
+    digests = np.empty((rows, cols), dtype=np.uint64)
+    for row in range(rows):
+        band = packed[row * tile:(row + 1) * tile]
+        if band.shape != (tile, cols * tile):
+            band = np.pad(band, ((0, tile - band.shape[0]), (0, cols * tile - width)))
+        blocks = band.astype(np.uint64).reshape(tile, cols, tile) * weights
+        digests[row] = blocks.sum(axis=(0, 2), dtype=np.uint64)
+    return digests
+
+
+class DigestCache:
+    """파일 해시 -> (이미지 크기, 타일 해시). cache_dir가 없으면 저장하지 않음"""
+
+    def __init__(self, cache_dir=None, tile=TILE_SIZE):
+        self.cache_dir = cache_dir
+        self.tile = tile
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, sha):
+        return os.path.join(self.cache_dir, f'{sha}-t{self.tile}-v{DIGEST_VERSION}.npz')
+
+    def get(self, sha):
+        if not self.cache_dir:
+            return None
+        try:
+            with np.load(self._path(sha)) as data:
+                return tuple(data['shape']), data['digests']
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(self, sha, shape, digests):
+        if not self.cache_dir:
+            return
+        tmp_path = self._path(sha) + '.tmp.npz'
+        np.savez(tmp_path, shape=np.array(shape[:2]), digests=digests)
+        os.replace(tmp_path, self._path(sha))
+
+    def digests(self, sha, pixels):
+        cached = self.get(sha)
+        if cached is not None and cached[0] == pixels.shape[:2]:
+            return cached[1]
+        digests = tile_digests(pixels, self.tile)
+        self.put(sha, pixels.shape, digests)
+        return digests
+
+
+def _runs(columns):
+    """정렬된 열 번호 -> 연속 구간 [(시작, 끝)]"""
+    runs = []
+    for col in columns:
+        if runs and runs[-1][1] == col:
+            runs[-1][1] = col + 1
+        else:
+            runs.append([col, col + 1])
+    return runs
+
+
+def diff_tiles(reference, test, changed, tile=TILE_SIZE):
+    """해시가 다른 타일만 픽셀 비교 -> (높이, 너비) uint8 최대 채널 차이 (나머지는 0)"""
+    magnitude = np.zeros(reference.shape[:2], dtype=np.uint8)
+    for row in np.unique(np.nonzero(changed)[0]):
+        rows = slice(row * tile, (row + 1) * tile)
+        # 한 타일 행 안에서 이어진 타일은 한 번에 계산
+        for start, end in _runs(np.nonzero(changed[row])[0]):
+            cols = slice(start * tile, end * tile)
+            delta = np.abs(reference[rows, cols].astype(np.int16) - test[rows, cols])
+            magnitude[rows, cols] = delta.max(axis=2)
+    return magnitude
+
+
+def write_heatmap(path, base, magnitude, threshold):
+    """흐린 회색 바탕 위에 차이 표시 (허용 범위 안: 파랑, 넘는 차이: 노랑 -> 빨강)"""
+    gray = np.asarray(Image.fromarray(base).convert('L'))
+    heatmap = np.repeat((160 + gray // 3)[..., None], 3, axis=2)
+    over = magnitude > threshold
+    heatmap[(magnitude > 0) & ~over] = (120, 160, 255)
+    strength = magnitude[over].astype(np.uint16)
+    heatmap[over] = np.column_stack((np.full_like(strength, 255), 220 - strength * 220 // 255,
+                                     np.zeros_like(strength)))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    Image.fromarray(heatmap).save(path, compress_level=1)
+
+
+def compare_images(reference_path, test_path, threshold=DEFAULT_THRESHOLD, max_mismatch=DEFAULT_MAX_MISMATCH,
+                   tile=TILE_SIZE, heatmap_path=None, cache_dir=None):
+    """이미지 한 쌍 비교 -> 결과 dict (프로세스 풀 작업 단위)"""
+    reference_sha, test_sha = file_digest(reference_path), file_digest(test_path)
+    if reference_sha == test_sha:
+        return {'status': 'identical'}
+
+    cache = DigestCache(cache_dir, tile)
+    test = load_rgba(test_path)
+    test_digests = cache.digests(test_sha, test)
+    cached = cache.get(reference_sha)
+    if cached is not None and cached[0] == test.shape[:2] and np.array_equal(cached[1], test_digests):
+        return {'status': 'same_pixels', 'reference_decoded': False}
+
+    reference = load_rgba(reference_path)
+    height, width = min(reference.shape[0], test.shape[0]), min(reference.shape[1], test.shape[1])
+    total = max(reference.shape[0], test.shape[0]) * max(reference.shape[1], test.shape[1])
+    result = {}
+    if reference.shape == test.shape:
+        changed = cache.digests(reference_sha, reference) != test_digests
+        extra = 0
+    else:
+        # 겹치는 영역만 비교하고 나머지는 모두 다른 픽셀로 계산
+        result['size'] = [list(reference.shape[1::-1]), list(test.shape[1::-1])]
+        reference, test = reference[:height, :width], test[:height, :width]
+        changed = tile_digests(reference, tile) != tile_digests(test, tile)
+        extra = total - height * width
+
+    result['changed_tiles'] = int(changed.sum())
+    result['tiles'] = int(changed.size)
+    if not changed.any() and not extra:
+        result['status'] = 'same_pixels'
+        return result
+
+    magnitude = diff_tiles(reference, test, changed, tile)
+    over = magnitude > threshold
+    mismatched = int(over.sum()) + extra
+    result['changed_pixels'] = int(np.count_nonzero(magnitude))
+    result['mismatched_pixels'] = mismatched
+    result['mismatch_percent'] = round(mismatched / total * 100, 4)
+    if over.any():
+        ys, xs = np.nonzero(over.any(axis=1))[0], np.nonzero(over.any(axis=0))[0]
+        result['bbox'] = [int(xs[0]), int(ys[0]), int(xs[-1]) + 1, int(ys[-1]) + 1]
+    result['status'] = 'fail' if 'size' in result or result['mismatch_percent'] > max_mismatch else 'pass'
+    if heatmap_path and result['changed_pixels']:
+        write_heatmap(heatmap_path, test, magnitude, threshold)
+        result['heatmap'] = heatmap_path
+    return result
+
+
+def _compare_job(job):
+    rel, reference_path, test_path, options = job
+    try:
+        return rel, compare_images(reference_path, test_path, **options)
+    except Exception as e:
+        return rel, {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+
+
+def collect_pngs(root):
+    """디렉터리 -> {상대 경로: 실제 경로} (파일 하나면 파일 이름으로)"""
+    if os.path.isfile(root):
+        return {os.path.basename(root): root}
+    found = {}
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            if name.lower().endswith('.png'):
+                path = os.path.join(dirpath, name)
+                found[os.path.relpath(path, root).replace(os.sep, '/')] = path
+    return found
+
+
+def compare_sets(reference_root, test_root, diff_dir=None, workers=None, threshold=DEFAULT_THRESHOLD,
+                 max_mismatch=DEFAULT_MAX_MISMATCH, tile=TILE_SIZE, cache_dir=None):
+    """두 PNG 세트를 프로세스 풀에서 비교 -> {상대 경로: 결과}"""
+    references, tests = collect_pngs(reference_root), collect_pngs(test_root)
+    results = {rel: {'status': 'missing'} for rel in references if rel not in tests}
+    results.update({rel: {'status': 'new'} for rel in tests if rel not in references})
+
+    jobs = []
+    for rel in sorted(set(references) & set(tests)):
+        heatmap = os.path.join(diff_dir, rel[:-4] + '.diff.png') if diff_dir else None
+        options = {'threshold': threshold, 'max_mismatch': max_mismatch, 'tile': tile,
+                   'heatmap_path': heatmap, 'cache_dir': cache_dir}
+        jobs.append((rel, references[rel], tests[rel], options))
+    if workers == 1 or len(jobs) < 2:
+        results.update(map(_compare_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            results.update(pool.map(_compare_job, jobs, chunksize=chunksize))
+    return dict(sorted(results.items()))
+
+
+def summarize(results):
+    counts = {}
+    for result in results.values():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='스크린샷 세트 시각 회귀 비교')
+    parser.add_argument('reference', help='기준 PNG 디렉터리 (또는 파일)')
+    parser.add_argument('test', help='비교할 PNG 디렉터리 (또는 파일)')
+    parser.add_argument('--diff-dir', help='히트맵 저장 위치')
+    parser.add_argument('--report', help='결과 JSON 저장 경로')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD, help='같은 픽셀로 볼 채널 차이 (0-255)')
+    parser.add_argument('--max-mismatch', type=float, default=DEFAULT_MAX_MISMATCH, help='허용 다른 픽셀 비율 (%%)')
+    parser.add_argument('--tile', type=int, default=TILE_SIZE, help='타일 크기 (px)')
+    parser.add_argument('--cache-dir', help='타일 해시 캐시 디렉터리')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = compare_sets(args.reference, args.test, args.diff_dir, args.workers, args.threshold,
+                           args.max_mismatch, args.tile, args.cache_dir)
+    elapsed = time.perf_counter() - start
+
+    counts = summarize(results)
+    print(f"PNG {len(results)}개 비교: {elapsed:.2f}s "
+          f"({', '.join(f'{status} {count}' for status, count in sorted(counts.items()))})")
+    for rel, result in results.items():
+        if result['status'] not in ('identical', 'same_pixels'):
+            print(f"  {rel}: {json.dumps(result, ensure_ascii=False)}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+        print(f"결과 저장: {args.report}")
+    failed = sum(counts.get(status, 0) for status in ('fail', 'missing', 'error'))
+    sys.exit(1 if failed else 0)
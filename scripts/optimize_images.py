@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+public/ PNG 무손실 재압축
+아이콘, 스플래시, favicon, OG 이미지를 픽셀이 완전히 같은 더 작은 PNG로 다시 씀
+
+- 색 표현: 알파가 모두 불투명하면 알파 제거, 무채색이면 그레이스케일,
+  256색 이하면 팔레트(1/2/4/8비트, 투명색은 tRNS)
+- 필터(none/sub/up/average/paeth/adaptive)를 빠른 압축으로 먼저 비교하고,
+  상위 후보만 zlib 9단계 + 전략(default/filtered/rle)으로 다시 압축
+- 결과를 디코딩해 원본과 RGBA 픽셀이 같은지 확인한 뒤, 더 작을 때만 교체
+- 매니페스트에 파일별 해시를 기록해 다시 실행하면 바뀌지 않은 파일은 건너뜀
+
+사용법:
+    python scripts/optimize_images.py
+    python scripts/optimize_images.py public/icons --dry-run --workers 4
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from png_stream import FILTERS, SIGNATURE, ZLIB_STRATEGIES, encode_png
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(SCRIPTS_DIR, '..', 'public')
+MANIFEST_PATH = os.path.join(SCRIPTS_DIR, '..', '.image_optimize_cache.json')
+# 탐색 방식이 바뀌면 올려서 매니페스트의 기존 결과를 무효화
+OPTIMIZER_VERSION = 1
+# 빠른 압축으로 고른 (색 표현, 필터) 중 최종 압축할 후보 수
+SHORTLIST = 3
+SCREEN_LEVEL = 6
+# 렌더링에 영향을 주므로 유지하는 보조 청크 (나머지 tEXt, tIME 등은 제거)
+KEEP_CHUNKS = (b'iCCP', b'sRGB', b'gAMA', b'cHRM', b'pHYs')
+
+
+def read_chunks(data):
+    """PNG bytes -> [(청크 종류, 데이터)]"""
+    if data[:8] != SIGNATURE:
+        raise ValueError("PNG 파일이 아님")
+    chunks, offset = [], 8
+    while offset < len(data):
+        length, chunk_type = struct.unpack('>I4s', data[offset:offset + 8])
+        chunks.append((chunk_type, data[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+    return chunks
+
+
+def _palette_depth(colors):
+    for depth in (1, 2, 4):
+        if colors <= 1 << depth:
+            return depth
+    return 8
+
+
+def representations(rgba):
+    """RGBA 배열 -> 픽셀이 같은 후보 [(모드, 배열, PngWriter 옵션)]"""
+    alpha = rgba[..., 3]
+    opaque = bool((alpha == 255).all())
+    gray = bool(((rgba[..., 0] == rgba[..., 1]) & (rgba[..., 1] == rgba[..., 2])).all())
+    if gray:
+        candidates = [('L', rgba[..., 0], {})] if opaque else [('LA', rgba[..., [0, 3]], {})]
+    else:
+        candidates = [('RGB', rgba[..., :3], {})] if opaque else [('RGBA', rgba, {})]
+
+    colors, inverse = np.unique(rgba.reshape(-1, 4).view(np.uint32).ravel(), return_inverse=True)
+    if len(colors) <= 256:
+        entries = colors.view(np.uint8).reshape(-1, 4)
+        # 투명한 색을 앞에 두어 tRNS를 짧게
+        order = np.argsort(entries[:, 3] == 255, kind='stable')
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        entries = entries[order]
+        indices = rank[inverse].reshape(alpha.shape).astype(np.uint8)
+        translucent = int((entries[:, 3] < 255).sum())
+        options = {'palette': entries[:, :3].tobytes(), 'bit_depth': _palette_depth(len(entries))}
+        if translucent:
+            options['transparency'] = entries[:translucent, 3].tobytes()
+        candidates.append(('P', indices, options))
+    return candidates
+
+
+def best_encoding(rgba, extra_chunks=()):
+    """가장 작은 PNG bytes와 선택한 설정"""
+    trials = []
+    for mode, pixels, options in representations(rgba):
+        for method in FILTERS + ('adaptive',):
+            size = len(encode_png(pixels, mode, level=SCREEN_LEVEL, filter_method=method, **options))
+            trials.append((size, mode, method, pixels, options))
+    trials.sort(key=lambda t: t[0])
+
+    best = None
+    for _size, mode, method, pixels, options in trials[:SHORTLIST]:
+        for strategy in ZLIB_STRATEGIES:
+            data = encode_png(pixels, mode, level=9, strategy=strategy, filter_method=method,
+                              extra_chunks=extra_chunks, **options)
+            if best is None or len(data) < len(best[0]):
+                best = (data, {'mode': mode, 'bit_depth': options.get('bit_depth', 8), 'filter': method,
+                               'strategy': strategy})
+    return best
+
+
+def _rgba(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert('RGBA'))
+
+
+def optimize_png(path, write=True):
+    """파일 하나 재압축 -> 결과 dict (프로세스 풀 작업 단위)"""
+    with open(path, 'rb') as f:
+        source = f.read()
+    result = {'before': len(source), 'after': len(source)}
+    chunks = read_chunks(source)
+    ihdr = chunks[0][1]
+    if ihdr[8] == 16 or any(chunk_type == b'acTL' for chunk_type, _data in chunks):
+        result['skipped'] = '16비트 또는 APNG'
+        result['sha256'] = hashlib.sha256(source).hexdigest()
+        return result
+
+    original = _rgba(source)
+    extra_chunks = [(chunk_type, data) for chunk_type, data in chunks if chunk_type in KEEP_CHUNKS]
+    data, settings = best_encoding(original, extra_chunks)
+    if len(data) >= len(source):
+        result['sha256'] = hashlib.sha256(source).hexdigest()
+        return result
+    if not np.array_equal(_rgba(data), original):
+        raise RuntimeError("재압축 결과의 픽셀이 원본과 다름")
+    result.update(settings)
+    result['after'] = len(data)
+    if write:
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    result['sha256'] = hashlib.sha256(data).hexdigest()
+    return result
+
+
+def _optimize_job(job):
+    rel, path, write = job
+    start = time.perf_counter()
+    try:
+        result = optimize_png(path, write)
+    except Exception as e:
+        result = {'error': f'{type(e).__name__}: {e}'}
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return rel, result
+
+
+def collect_pngs(paths):
+    """파일/디렉터리 목록 -> [(공개 디렉터리 기준 상대 경로, 실제 경로)]"""
+    found = []
+    for root in paths:
+        if os.path.isfile(root):
+            found.append((os.path.basename(root), root))
+            continue
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for name in filenames:
+                if name.lower().endswith('.png'):
+                    path = os.path.join(dirpath, name)
+                    found.append((os.path.relpath(path, root).replace(os.sep, '/'), path))
+    return sorted(found)
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest.get('files', {}) if manifest.get('version') == OPTIMIZER_VERSION else {}
+
+
+def save_manifest(path, files):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': OPTIMIZER_VERSION, 'files': files}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def optimize_all(paths, manifest_path=MANIFEST_PATH, workers=None, write=True):
+    """매니페스트 해시와 다른 파일만 프로세스 풀에서 재압축 -> {상대 경로: 결과}"""
+    pngs = collect_pngs(paths)
+    manifest = load_manifest(manifest_path)
+    jobs, results = [], {}
+    for rel, path in pngs:
+        key = os.path.abspath(path)
+        if manifest.get(key, {}).get('sha256') == file_sha256(path):
+            results[rel] = {'cached': True}
+        else:
+            jobs.append((rel, path, write))
+
+    # 큰 파일(스플래시)부터 넣어 마지막에 한 작업만 남는 일을 줄임
+    jobs.sort(key=lambda job: os.path.getsize(job[1]), reverse=True)
+    if workers == 1 or len(jobs) < 2:
+        results.update(map(_optimize_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results.update(pool.map(_optimize_job, jobs))
+
+    if write:
+        for rel, path in pngs:
+            result = results[rel]
+            if 'sha256' in result:
+                manifest[os.path.abspath(path)] = {'sha256': result['sha256'], 'size': result['after']}
+        save_manifest(manifest_path, manifest)
+    return dict(sorted(results.items()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='public/ PNG 무손실 재압축')
+    parser.add_argument('paths', nargs='*', default=[PUBLIC_DIR], help='PNG 파일 또는 디렉터리 (기본: public/)')
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help='재실행 시 건너뛸 파일 해시 기록')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help='파일을 바꾸지 않고 절감량만 출력')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = optimize_all(args.paths, args.manifest, args.workers, not args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    before = after = cached = 0
+    for rel, result in results.items():
+        if result.get('cached'):
+            cached += 1
+        elif 'error' in result:
+            print(f"  {rel}: [오류] {result['error']}")
+        elif 'skipped' in result:
+            print(f"  {rel}: 건너뜀 ({result['skipped']})")
+        else:
+            before += result['before']
+            after += result['after']
+            saved = result['before'] - result['after']
+            detail = (f"{result['mode']}/{result['bit_depth']}비트, {result['filter']}, {result['strategy']}"
+                      if saved else "이미 최적")
+            print(f"  {rel}: {result['before']:,}B -> {result['after']:,}B (-{saved:,}B, "
+                  f"{saved / result['before']:.1%}) [{detail}] {result['seconds']:.2f}s")
+    print(f"PNG {len(results)}개 (매니페스트와 같아 건너뜀 {cached}개): {before:,}B -> {after:,}B "
+          f"(-{before - after:,}B), {elapsed:.1f}s" + (" [dry run]" if args.dry_run else ""))
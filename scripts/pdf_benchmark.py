@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+PDF 생성 벤치마크
+사업 계획서 헬퍼(create_table, create_highlight_box, create_stat_boxes,
+build_content와 같은 cached_paragraph 문단)로 10/100/1000 페이지 합성 문서를 만들고
+create_pdf와 같은 섹션 렌더링 + 병합 경로의 단계별 시간, 최대 메모리, 출력 크기를 측정
+--paragraph reportlab이면 본문 문단을 reportlab 기본 Paragraph로 만들어 비교
+
+사용법:
+    python scripts/pdf_benchmark.py --output bench.json
+    python scripts/pdf_benchmark.py --baseline bench.json --output bench-new.json
+    python scripts/pdf_benchmark.py --paragraph reportlab --output bench-reportlab.json
+"""
+
+import argparse
+import functools
+import io
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+import pypdf
+import reportlab
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, Spacer, PageBreak
+
+import create_business_plan_pdf as plan
+from pdf_korean_wrap import line_breaker
+from pdf_profile import flowable_classes
+from pdf_sections import split_sections, render_sections, assemble_pdf
+
+DEFAULT_SIZES = [10, 100, 1000]
+
+
+class _PhaseTimer:
+    """wrap/split(레이아웃), drawOn(그리기), Canvas.save(쓰기) 누적 시간
+
+    Frame은 flowable.wrap/split을 직접 호출하므로 해당 메서드를 정의한
+    모든 Flowable 하위 클래스를 감쌈. 중첩 호출(표 안의 Paragraph,
+    super() 호출 등)은 가장 바깥 호출에만 합산.
+    """
+
+    _phases = {'wrap': 'layout_s', 'split': 'layout_s', 'drawOn': 'draw_s'}
+
+    @classmethod
+    def _targets(cls):
+        for flowable_cls in flowable_classes():
+            for name, phase in cls._phases.items():
+                if name in flowable_cls.__dict__:
+                    yield flowable_cls, name, phase
+        yield canvas.Canvas, 'save', 'write_s'
+
+    def __init__(self):
+        self.totals = {'layout_s': 0.0, 'draw_s': 0.0, 'write_s': 0.0}
+        self._depth = 0
+        self._originals = []
+
+    def _timed(self, phase, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self._depth:
+                return func(*args, **kwargs)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[phase] += time.perf_counter() - start
+                self._depth -= 1
+        return wrapper
+
+    def __enter__(self):
+        for cls, name, phase in list(self._targets()):
+            original = cls.__dict__[name]
+            self._originals.append((cls, name, original))
+            setattr(cls, name, self._timed(phase, original))
+        return self
+
+    def __exit__(self, *exc):
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+
+
+# 합성 문서 본문 문단 생성 방식 (cached: build_content와 같은 KoreanParagraph + 파싱 캐시)
+PARAGRAPH_MODES = {
+    'cached': plan.cached_paragraph,
+    'reportlab': Paragraph,
+}
+
+
+def build_synthetic_story(pages, styles, paragraph=plan.cached_paragraph):
+    """한 페이지 분량의 블록을 pages번 반복한 story (블록마다 PageBreak)"""
+    story = []
+    for i in range(1, pages + 1):
+        story.append(paragraph(f"{i}. 합성 섹션 {i}", styles['SectionTitle']))
+        story.append(paragraph(
+            f'<b>벤치마크 페이지 {i}</b> - 표, 박스, 통계, 문단 혼합 레이아웃',
+            styles['Highlight']
+        ))
+        story.append(Spacer(1, 5*mm))
+        story.append(plan.create_stat_boxes([
+            (f"{i}억", "매출"),
+            (f"{i % 100}%", "점유율"),
+            (f"{i * 3}개", "매장 수"),
+        ], styles))
+        story.append(Spacer(1, 8*mm))
+        table_data = [["연도", "매장 수", "예약 건수", "순이익"]]
+        for year in range(1, 6):
+            table_data.append([f"{year}년차", f"{year * i:,}개", f"{year * i * 120:,}건", f"{year * i * 7:,}억"])
+        story.append(plan.create_table(table_data, [30*mm, 40*mm, 45*mm, 45*mm]))
+        story.append(Spacer(1, 8*mm))
+        story.append(paragraph(f"{i}.1 세부 항목", styles['SubsectionTitle']))
+        for item in ["고객과 매장을 <b>연결</b>해주는 플랫폼",
+                     "예약, 결제, 채팅, 리뷰 등 <b>모든 것을 앱으로</b>",
+                     f"섹션 {i}의 본문 문장입니다. " * 3]:
+            story.append(paragraph(f"• {item}", styles['BulletPoint']))
+        story.append(Spacer(1, 5*mm))
+        story.append(plan.create_highlight_box(
+            f'<b>요약 {i}:</b> 합성 문서의 하이라이트 박스입니다. 줄바꿈과 표 레이아웃을 함께 측정합니다.',
+            styles
+        ))
+        story.append(PageBreak())
+    return story
+
+
+_FOOTER_RE = re.compile(r'- (\d+) -')
+
+
+def footer_number(page):
+    """페이지 푸터의 쪽 번호 (없으면 None)"""
+    match = _FOOTER_RE.search(page.extract_text())
+    return int(match.group(1)) if match else None
+
+
+def _toc_numbers(page):
+    """목차 페이지 오른쪽 열의 쪽 번호들 (위에서 아래 순서)"""
+    width = float(page.mediabox.width)
+    found = []
+
+    def visit(text, _cm, tm, _font, _size):
+        if text.strip().isdigit() and tm[4] > width / 2:
+            found.append((-tm[5], int(text)))
+
+    page.extract_text(visitor_text=visit)
+    return [number for _y, number in sorted(found)]
+
+
+def _flatten_outline(items):
+    for item in items:
+        if isinstance(item, list):
+            yield from _flatten_outline(item)
+        else:
+            yield item
+
+
+def toc_mismatches(pdf_bytes, toc_start=1):
+    """목차 항목 번호가 해당 북마크가 가리키는 페이지의 푸터 번호와 다른 항목 목록
+
+    목차 항목과 북마크는 같은 제목 목록에서 같은 순서로 만들어지므로 순서대로 짝지음
+    """
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    outline = list(_flatten_outline(reader.outline))
+    if not outline:
+        return []
+    numbers = []
+    for page in reader.pages[toc_start:]:
+        page_numbers = _toc_numbers(page)
+        if not page_numbers or len(numbers) >= len(outline):
+            break
+        numbers.extend(page_numbers)
+
+    mismatches = []
+    if len(numbers) != len(outline):
+        mismatches.append(f"목차 항목 {len(numbers)}개, 북마크 {len(outline)}개")
+    for item, number in zip(outline, numbers):
+        target = reader.get_destination_page_number(item)
+        footer = footer_number(reader.pages[target])
+        if number != target + 1 or footer != number:
+            mismatches.append(f"{item.title}: 목차 {number}, {target + 1}쪽 푸터 {footer}")
+    return mismatches
+
+
+def run_case(pages, styles, measure_memory=True, paragraph_mode='cached'):
+    """합성 문서 하나를 생성하고 측정값 dict 반환"""
+    paragraph = PARAGRAPH_MODES[paragraph_mode]
+    # 반복 실행끼리 비교할 수 있도록 매번 빈 캐시에서 시작
+    plan.cached_paragraph.clear()
+    line_breaker.clear()
+    start = time.perf_counter()
+    story = build_synthetic_story(pages, styles, paragraph)
+    story_s = time.perf_counter() - start
+
+    sections = split_sections(story)
+    with _PhaseTimer() as timer:
+        render_start = time.perf_counter()
+        rendered, _hits = render_sections(sections, plan.DOC_OPTIONS)
+        render_s = time.perf_counter() - render_start
+
+    assemble_start = time.perf_counter()
+    pdf_bytes = assemble_pdf(plan.render_cover(), rendered, plan.decorate_content_page)
+    assemble_s = time.perf_counter() - assemble_start
+
+    result = {'story_s': story_s}
+    result.update(timer.totals)
+    result['other_s'] = max(render_s - sum(timer.totals.values()), 0.0)
+    result['assemble_s'] = assemble_s
+    result['total_s'] = story_s + render_s + assemble_s
+    result = {k: round(v, 4) for k, v in result.items()}
+
+    reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
+    result.update({
+        'requested_pages': pages,
+        'sections': len(sections),
+        'pages': len(reader.pages),
+        'output_bytes': len(pdf_bytes),
+        # 표지 1쪽 + 합성 블록당 1쪽, 마지막 페이지 푸터가 연속 번호인지 확인
+        'pages_ok': len(reader.pages) == pages + 1,
+        'numbering_ok': footer_number(reader.pages[-1]) == len(reader.pages),
+    })
+
+    if measure_memory:
+        # tracemalloc은 실행을 느리게 하므로 시간 측정과 별도 실행
+        tracemalloc.start()
+        plan.cached_paragraph.clear()
+        line_breaker.clear()
+        memory_sections = split_sections(build_synthetic_story(pages, styles, paragraph))
+        assemble_pdf(plan.render_cover(), render_sections(memory_sections, plan.DOC_OPTIONS)[0],
+                     plan.decorate_content_page)
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_mb'] = round(peak / (1024 * 1024), 2)
+    return result
+
+
+def run_benchmark(sizes, repeat=1, measure_memory=True, paragraph_mode='cached'):
+    styles = plan.get_styles()
+    # 실제 사업 계획서(표지 + 목차)에서 목차 번호와 푸터 번호 일치 확인
+    toc_errors = toc_mismatches(plan.render_pdf())
+    for line in toc_errors:
+        print(f"목차/푸터 번호 불일치: {line}")
+    cases = {}
+    for pages in sizes:
+        runs = [run_case(pages, styles, measure_memory and i == 0, paragraph_mode) for i in range(repeat)]
+        best = dict(min(runs, key=lambda r: r['total_s']))
+        if 'peak_memory_mb' in runs[0]:
+            best['peak_memory_mb'] = runs[0]['peak_memory_mb']
+        cases[str(pages)] = best
+        print(f"{pages:>5}p  total {best['total_s']:.3f}s  layout {best['layout_s']:.3f}s  "
+              f"draw {best['draw_s']:.3f}s  write {best['write_s']:.3f}s  assemble {best['assemble_s']:.3f}s  "
+              f"mem {best.get('peak_memory_mb', '-')}MB  {best['output_bytes']:,}B")
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'reportlab': reportlab.Version,
+            'pypdf': pypdf.__version__,
+            'font': plan.FONT_NAME,
+            'repeat': repeat,
+            'paragraph': paragraph_mode,
+        },
+        'checks': {'toc_numbers_ok': not toc_errors},
+        'cases': cases,
+    }
+
+
+def compare_with_baseline(results, baseline, time_tolerance=0.2, size_tolerance=0.05):
+    """기준 결과와 비교해 회귀 목록 반환"""
+    regressions = []
+    mode, base_mode = results['meta'].get('paragraph'), baseline.get('meta', {}).get('paragraph', 'reportlab')
+    if mode != base_mode:
+        regressions.append(f"문단 방식이 기준과 다름 ({base_mode} -> {mode}), --paragraph {base_mode}로 다시 측정")
+    if not results.get('checks', {}).get('toc_numbers_ok', True):
+        regressions.append("사업 계획서: 목차 쪽 번호와 푸터 번호 불일치")
+    for pages, case in results['cases'].items():
+        base = baseline.get('cases', {}).get(pages)
+        if not case['pages_ok'] or not case['numbering_ok']:
+            regressions.append(f"{pages}p: 페이지 수/번호 오류 (pages={case['pages']})")
+        if base is None:
+            continue
+        if case['pages'] != base['pages']:
+            regressions.append(f"{pages}p: 페이지 수 {base['pages']} -> {case['pages']}")
+        for key in ('total_s', 'layout_s', 'draw_s', 'write_s', 'assemble_s'):
+            # 아주 짧은 구간은 측정 잡음이 커서 제외
+            if base.get(key, 0) >= 0.05 and case[key] > base[key] * (1 + time_tolerance):
+                regressions.append(f"{pages}p: {key} {base[key]:.3f}s -> {case[key]:.3f}s")
+        if case['output_bytes'] > base['output_bytes'] * (1 + size_tolerance):
+            regressions.append(f"{pages}p: 출력 크기 {base['output_bytes']:,}B -> {case['output_bytes']:,}B")
+        if 'peak_memory_mb' in case and 'peak_memory_mb' in base \
+                and case['peak_memory_mb'] > base['peak_memory_mb'] * (1 + size_tolerance):
+            regressions.append(f"{pages}p: 최대 메모리 {base['peak_memory_mb']}MB -> {case['peak_memory_mb']}MB")
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='PDF 생성 벤치마크')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='합성 문서 페이지 수')
+    parser.add_argument('--repeat', type=int, default=1, help='크기별 반복 횟수 (최솟값 사용)')
+    parser.add_argument('--no-memory', action='store_true', help='최대 메모리 측정 생략')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON')
+    parser.add_argument('--time-tolerance', type=float, default=0.2, help='허용 시간 증가율 (기본 20%%)')
+    parser.add_argument('--paragraph', choices=sorted(PARAGRAPH_MODES), default='cached',
+                        help='본문 문단 생성 방식 (기본: build_content와 같은 cached_paragraph)')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes, args.repeat, not args.no_memory, args.paragraph)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.time_tolerance)
+        if regressions:
+            print("회귀 발견:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("기준 대비 회귀 없음")
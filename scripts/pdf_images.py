@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+PDF에 넣을 래스터 이미지 전처리
+인쇄 크기 x 목표 DPI에 맞게 줄이고, 사진/스크린샷은 JPEG(DCT), 단색 위주 그래픽은
+무손실(reportlab이 Flate로 압축) 중 작은 쪽으로 다시 인코딩
+같은 내용의 이미지는 파일 해시로 한 번만 처리하며, 레이아웃 전에 프로세스 풀에서 병렬 처리
+
+    embedder = ImageEmbedder(dpi=150)
+    embedder.prepare([(path, 170*mm, 220*mm) for path in paths])
+    story.append(embedder.flowable(path, 170*mm, 220*mm))
+
+측정:
+    python scripts/pdf_images.py docs/screenshots .playwright-mcp search-page-full.png --dpi 150
+"""
+
+import argparse
+import hashlib
+import io
+import math
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image as PILImage, ImageOps
+from reportlab.platypus import Image
+
+DEFAULT_DPI = 150
+DEFAULT_JPEG_QUALITY = 85
+# 무손실이 JPEG보다 이 비율 이하로만 크면 무손실 선택 (글자 번짐 방지)
+LOSSLESS_PREFERENCE = 1.25
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+
+def file_digest(path):
+    """이미지 파일 내용 SHA-256"""
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def fit_size(source_size, max_width, max_height=None):
+    """원본 비율을 유지하며 (max_width, max_height) 안에 들어가는 인쇄 크기 (pt)"""
+    width, height = source_size
+    scale = max_width / width
+    if max_height is not None:
+        scale = min(scale, max_height / height)
+    return width * scale, height * scale
+
+
+def encode_image(image, printed_size, dpi=DEFAULT_DPI, jpeg_quality=DEFAULT_JPEG_QUALITY):
+    """PIL 이미지 -> (인코딩 bytes, 'JPEG' | 'PNG', 픽셀 크기)
+
+    인쇄 크기(pt)에 dpi를 곱한 픽셀 수로 줄이고(확대는 하지 않음),
+    JPEG과 reportlab이 실제로 쓰는 Flate(원시 픽셀의 zlib) 크기를 비교해 형식 선택
+    """
+    image = ImageOps.exif_transpose(image)
+    if image.mode == 'P' and 'transparency' in image.info:
+        image = image.convert('RGBA')
+    elif image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGB')
+
+    target = (max(1, math.ceil(printed_size[0] / 72 * dpi)), max(1, math.ceil(printed_size[1] / 72 * dpi)))
+    if target[0] < image.width:
+        image = image.resize(target, PILImage.Resampling.LANCZOS)
+
+    # 실제로 투명한 픽셀이 있을 때만 알파 유지 (JPEG 불가)
+    if image.mode == 'RGBA':
+        if image.getchannel('A').getextrema()[0] < 255:
+            buffer = io.BytesIO()
+            image.save(buffer, 'PNG')
+            return buffer.getvalue(), 'PNG', image.size
+        image = image.convert('RGB')
+
+    jpeg = io.BytesIO()
+    image.save(jpeg, 'JPEG', quality=jpeg_quality, optimize=True)
+    flate_size = len(zlib.compress(image.tobytes()))
+    if flate_size <= jpeg.tell() * LOSSLESS_PREFERENCE:
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        return buffer.getvalue(), 'PNG', image.size
+    return jpeg.getvalue(), 'JPEG', image.size
+
+
+def prepare_image(path, max_width, max_height=None, dpi=DEFAULT_DPI, jpeg_quality=DEFAULT_JPEG_QUALITY,
+                  digest=None):
+    """이미지 파일 하나 전처리 -> 항목 dict (프로세스 풀 작업 단위)"""
+    with open(path, 'rb') as f:
+        source = f.read()
+    with PILImage.open(io.BytesIO(source)) as image:
+        image.load()
+        source_size = ImageOps.exif_transpose(image).size
+        printed = fit_size(source_size, max_width, max_height)
+        data, kind, pixels = encode_image(image, printed, dpi, jpeg_quality)
+    return {
+        'digest': digest or hashlib.sha256(source).hexdigest(),
+        'data': data,
+        # 섹션 캐시 키용: 원본이 같아도 dpi/품질/크기가 바뀌면 삽입 데이터가 달라짐
+        'data_digest': hashlib.sha256(data).hexdigest(),
+        'format': kind,
+        'pixels': pixels,
+        'source_pixels': source_size,
+        'source_bytes': len(source),
+        'box': (max_width, max_height),
+    }
+
+
+def _prepare_job(job):
+    return prepare_image(*job)
+
+
+class ImageEmbedder:
+    """이미지 경로 -> 전처리된 Image flowable
+
+    내용 해시가 같은 이미지는 경로가 달라도 한 번만 전처리하고 같은 bytes를 쓰므로,
+    reportlab(섹션 안)과 assemble_pdf(섹션 사이) 모두에서 PDF에 한 번만 저장됨.
+    같은 이미지를 여러 크기로 쓰면 가장 큰 크기 기준으로 전처리.
+    """
+
+    def __init__(self, dpi=DEFAULT_DPI, jpeg_quality=DEFAULT_JPEG_QUALITY, workers=None):
+        self.dpi = dpi
+        self.jpeg_quality = jpeg_quality
+        self.workers = workers
+        self._entries = {}
+        self._digests = {}
+        self.requests = 0
+
+    def digest(self, path):
+        """파일 크기/수정 시각이 같으면 해시를 다시 계산하지 않음"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = file_digest(path)
+        return digest
+
+    def _covers(self, entry, max_width, max_height):
+        width, height = entry['box']
+        return width >= max_width and (height is None or (max_height is not None and height >= max_height))
+
+    def prepare(self, specs):
+        """[(경로, 최대 폭 pt, 최대 높이 pt 또는 None)]를 레이아웃 전에 병렬 전처리"""
+        boxes = {}
+        for spec in specs:
+            path, max_width = spec[0], spec[1]
+            max_height = spec[2] if len(spec) > 2 else None
+            digest = self.digest(path)
+            if digest in boxes:
+                _path, width, height = boxes[digest]
+                height = None if height is None or max_height is None else max(height, max_height)
+                boxes[digest] = (path, max(width, max_width), height)
+            else:
+                boxes[digest] = (path, max_width, max_height)
+
+        jobs = [(path, width, height, self.dpi, self.jpeg_quality, digest)
+                for digest, (path, width, height) in boxes.items()
+                if digest not in self._entries or not self._covers(self._entries[digest], width, height)]
+        if self.workers == 1 or len(jobs) < 2:
+            results = [_prepare_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(_prepare_job, jobs))
+        for entry in results:
+            self._entries[entry['digest']] = entry
+        return len(jobs)
+
+    def flowable(self, path, max_width, max_height=None, hAlign='CENTER'):
+        """전처리된 데이터로 만든 Image (prepare하지 않은 이미지는 여기서 바로 처리)"""
+        digest = self.digest(path)
+        entry = self._entries.get(digest)
+        if entry is None or not self._covers(entry, max_width, max_height):
+            self.prepare([(path, max_width, max_height)])
+            entry = self._entries[digest]
+        self.requests += 1
+        width, height = fit_size(entry['source_pixels'], max_width, max_height)
+        image = Image(io.BytesIO(entry['data']), width, height)
+        image.hAlign = hAlign
+        # 섹션 캐시 키 계산용 (pdf_sections._fingerprint), 원본 파일이 아니라 실제 삽입되는 데이터의 해시
+        image.content_digest = entry['data_digest']
+        return image
+
+    def stats(self):
+        entries = self._entries.values()
+        source = sum(e['source_bytes'] for e in entries)
+        embedded = sum(len(e['data']) for e in entries)
+        return {
+            'requests': self.requests,
+            'unique_images': len(self._entries),
+            'jpeg': sum(1 for e in entries if e['format'] == 'JPEG'),
+            'lossless': sum(1 for e in entries if e['format'] == 'PNG'),
+            'source_bytes': source,
+            'embedded_bytes': embedded,
+        }
+
+
+def collect_images(paths):
+    """파일/디렉터리 목록 -> 이미지 파일 경로 (디렉터리는 이름순)"""
+    found = []
+    for root in paths:
+        if os.path.isfile(root):
+            found.append(root)
+            continue
+        for name in sorted(os.listdir(root)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                found.append(os.path.join(root, name))
+    return found
+
+
+if __name__ == '__main__':
+    from reportlab.lib.units import mm
+
+    parser = argparse.ArgumentParser(description='PDF 이미지 전처리 측정')
+    parser.add_argument('paths', nargs='+', help='이미지 파일 또는 디렉터리')
+    parser.add_argument('--dpi', type=int, default=DEFAULT_DPI)
+    parser.add_argument('--quality', type=int, default=DEFAULT_JPEG_QUALITY, help='JPEG 품질')
+    parser.add_argument('--width', type=float, default=170, help='인쇄 폭 (mm)')
+    parser.add_argument('--height', type=float, default=220, help='최대 인쇄 높이 (mm)')
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    images = collect_images(args.paths)
+    embedder = ImageEmbedder(args.dpi, args.quality, args.workers)
+    start = time.perf_counter()
+    embedder.prepare([(path, args.width * mm, args.height * mm) for path in images])
+    elapsed = time.perf_counter() - start
+
+    stats = embedder.stats()
+    print(f"이미지 {len(images)}개 (고유 {stats['unique_images']}개) 전처리: {elapsed:.2f}s")
+    print(f"  JPEG {stats['jpeg']}개 / 무손실 {stats['lossless']}개")
+    print(f"  원본 {stats['source_bytes']:,}B -> {stats['embedded_bytes']:,}B "
+          f"({stats['embedded_bytes'] / max(stats['source_bytes'], 1):.1%})")
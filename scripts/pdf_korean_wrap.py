@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+한국어 줄바꿈
+어절(띄어쓰기) 단위로 줄을 나누고, 한 어절이 한 줄보다 길 때만 음절 사이에서 끊음
+닫는 부호/문장부호는 줄 앞에, 여는 부호는 줄 끝에 오지 않게 하고(금칙),
+숫자(1,000 / 3.5)는 중간에서 나누지 않음
+폰트별 글자 폭 표와 줄바꿈 결과를 캐시해, 같은 문단을 다시 레이아웃할 때는 폭 계산과 줄 나누기를 건너뜀
+
+벤치마크 (긴 한국어 문단):
+    python scripts/pdf_korean_wrap.py --paragraphs 200 --repeat 5
+"""
+
+import argparse
+import threading
+import time
+from collections import OrderedDict
+
+from reportlab.pdfbase.pdfmetrics import getAscentDescent, stringWidth
+from reportlab.platypus import Paragraph
+from reportlab.platypus.paragraph import FragLine, ParaLines, _handleBulletWidth
+from reportlab.rl_config import _FUZZ
+
+# 줄 앞에 올 수 없는 문자 (닫는 부호, 문장부호, 단위 기호)
+CANNOT_START = frozenset('.,!?:;)]}>%~·…」』〉》】〕”’、。，．！？：；）］｝')
+# 줄 끝에 올 수 없는 문자 (여는 부호, 통화 기호)
+CANNOT_END = frozenset('([{<「『〈《【〔“‘（［｛₩$#')
+# 숫자 한 덩어리로 취급하는 문자
+_NUMERIC = frozenset('0123456789,.')
+
+
+def _is_cjk(ch):
+    code = ord(ch)
+    return code >= 0x2E80 or 0x1100 <= code < 0x1200
+
+
+def can_break_between(prev, cur):
+    """어절 안에서 prev와 cur 사이를 끊을 수 있는지 (띄어쓰기가 아닌 곳)"""
+    if cur in CANNOT_START or prev in CANNOT_END:
+        return False
+    if prev in _NUMERIC and cur in _NUMERIC:
+        return False
+    return _is_cjk(prev) or _is_cjk(cur)
+
+
+class _FontWidths(dict):
+    """글자 -> 1pt 기준 폭. 처음 보는 글자만 stringWidth로 계산"""
+
+    def __init__(self, font_name):
+        super().__init__()
+        self.font_name = font_name
+
+    def __missing__(self, ch):
+        width = self[ch] = stringWidth(ch, self.font_name, 1)
+        return width
+
+
+def break_text(text, widths, max_widths):
+    """글자별 폭으로 줄 나누기 -> [(시작, 끝, 폭, 띄어쓰기 수, 강제 줄바꿈)]
+
+    text의 '\\n'은 강제 줄바꿈(<br/>). 줄 끝과 줄머리의 띄어쓰기는 폭에서 빼고 줄에서도 제외
+    """
+    n = len(text)
+    lines = []
+    pos = 0
+    while pos < n:
+        max_width = max_widths[min(len(lines), len(max_widths) - 1)]
+        width = 0.0
+        word_break = char_break = None
+        forced = False
+        i = pos
+        while i < n:
+            ch = text[i]
+            if ch == '\n':
+                forced = True
+                break
+            if i > pos:
+                prev = text[i - 1]
+                if prev == ' ':
+                    if ch != ' ' and ch not in CANNOT_START:
+                        word_break = i
+                elif ch != ' ' and can_break_between(prev, ch):
+                    char_break = i
+            w = widths[i]
+            # 띄어쓰기는 줄 끝에서 버려지므로 넘쳐도 줄을 끊지 않음
+            if ch != ' ' and width + w > max_width + _FUZZ and i > pos:
+                break
+            width += w
+            i += 1
+
+        if forced or i >= n:
+            end = next_pos = i
+        else:
+            end = next_pos = word_break or char_break or i
+            if word_break and char_break and char_break > word_break:
+                # 넘친 어절이 다음 줄에도 들어가지 않으면 옮기지 않고 이 줄에서 바로 끊음
+                word_end = word_break
+                while word_end < n and text[word_end] not in ' \n':
+                    word_end += 1
+                next_width = max_widths[min(len(lines) + 1, len(max_widths) - 1)]
+                if sum(widths[word_break:word_end]) > next_width + _FUZZ:
+                    end = next_pos = char_break
+        while end > pos and text[end - 1] == ' ':
+            end -= 1
+        lines.append((pos, end, sum(widths[pos:end]), text.count(' ', pos, end), forced))
+        if forced:
+            next_pos += 1
+        # <br/> 뒤 줄머리 띄어쓰기도 Paragraph처럼 버림 (wordCount, 양쪽 정렬에서 제외)
+        while next_pos < n and text[next_pos] == ' ':
+            next_pos += 1
+        pos = next_pos
+    return lines
+
+
+class KoreanLineBreaker:
+    """폰트별 글자 폭 표 + (문단 내용, 줄 폭) 단위 줄바꿈 결과 LRU 캐시
+
+    max_entries가 0이면 줄바꿈 결과는 캐시하지 않음 (글자 폭 표는 항상 사용)
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._fonts = {}
+        self._metrics = {}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def font_widths(self, font_name):
+        table = self._fonts.get(font_name)
+        if table is None:
+            table = self._fonts[font_name] = _FontWidths(font_name)
+        return table
+
+    def _ascent_descent(self, font_name, font_size):
+        key = (font_name, font_size)
+        metrics = self._metrics.get(key)
+        if metrics is None:
+            metrics = self._metrics[key] = getAscentDescent(font_name, font_size)
+        return metrics
+
+    def _spans(self, runs, max_widths):
+        key = (runs, tuple(max_widths))
+        if self.max_entries > 0:
+            with self._lock:
+                spans = self._memo.get(key)
+                if spans is not None:
+                    self._memo.move_to_end(key)
+                    self.hits += 1
+                    return spans
+
+        widths = []
+        for text, font_name, font_size in runs:
+            if text == '\n':
+                widths.append(0.0)
+                continue
+            table = self.font_widths(font_name)
+            widths.extend([table[ch] * font_size for ch in text])
+        spans = break_text(''.join(run[0] for run in runs), widths, max_widths)
+
+        with self._lock:
+            self.misses += 1
+            if self.max_entries > 0:
+                self._memo[key] = spans
+                while len(self._memo) > self.max_entries:
+                    self._memo.popitem(last=False)
+        return spans
+
+    def break_frags(self, frags, max_widths):
+        """Paragraph frags -> (kind=1 ParaLines, 가장 긴 줄 폭)"""
+        runs = tuple(('\n', None, 0) if getattr(f, 'lineBreak', False) else (f.text, f.fontName, f.fontSize)
+                     for f in frags)
+        spans = self._spans(runs, max_widths)
+        text = ''.join(run[0] for run in runs)
+
+        # 각 frag가 전체 텍스트에서 차지하는 구간
+        bounds = []
+        offset = 0
+        for run in runs:
+            bounds.append((offset, offset + len(run[0])))
+            offset += len(run[0])
+
+        lines = []
+        width_max = 0
+        first = 0
+        for index, (start, end, width, spaces, forced) in enumerate(spans):
+            max_width = max_widths[min(index, len(max_widths) - 1)]
+            words = []
+            font_size = ascent = descent = 0
+            while first < len(bounds) and bounds[first][1] <= start:
+                first += 1
+            join = ()
+            for k in range(first, len(bounds)):
+                run_start, run_end = bounds[k]
+                if run_start >= end:
+                    # 강제 줄바꿈이면 줄 끝 띄어쓰기 뒤의 <br/> frag까지 찾아 둠
+                    if forced and runs[k][0] != '\n':
+                        continue
+                    if forced:
+                        join = (frags[k],)
+                    break
+                run_text, font_name, size = runs[k]
+                if run_text == '\n':
+                    continue
+                a, b = max(start, run_start), min(end, run_end)
+                if a < b:
+                    words.append(frags[k].clone(text=run_text[a - run_start:b - run_start]))
+                    run_ascent, run_descent = self._ascent_descent(font_name, size)
+                    font_size = max(font_size, size)
+                    ascent = max(ascent, run_ascent)
+                    descent = min(descent, run_descent)
+            if not words:
+                # 빈 줄(연속된 <br/>)도 줄 높이는 유지
+                f = frags[min(first, len(frags) - 1)]
+                font_size = f.fontSize
+                ascent, descent = self._ascent_descent(f.fontName, f.fontSize)
+            width_max = max(width_max, width)
+            if not forced and end < len(text) and text[end] == ' ' and words:
+                join = (words[-1].clone(text=' '),)
+            word_count = spaces + 1 if end > start else 0
+            # joinFrags: split 때 다음 줄 앞에 다시 넣을 frag (<br/>, 띄어쓰기, 음절 사이면 없음)
+            lines.append(FragLine(kind=1, extraSpace=max_width - width, wordCount=word_count, words=words,
+                                  fontSize=font_size, ascent=ascent, descent=descent, maxWidth=max_width,
+                                  currentWidth=width, lineBreak=forced, joinFrags=join))
+        return ParaLines(kind=1, lines=lines), width_max
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._memo),
+                'fonts': len(self._fonts),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memo.clear()
+            self._fonts.clear()
+            self._metrics.clear()
+            self.hits = self.misses = 0
+
+
+line_breaker = KoreanLineBreaker()
+
+
+class KoreanParagraph(Paragraph):
+    """한국어 줄바꿈 규칙(어절 단위 + 금칙)으로 줄을 나누는 Paragraph
+
+    이미지/앵커(cbDefn), endDots, 하이픈 분리, wordWrap(CJK/RTL 등)이 지정된 문단은
+    reportlab 기본 줄바꿈을 그대로 사용
+    """
+
+    def _use_default_breaker(self):
+        style = self.style
+        if style.wordWrap or style.endDots or getattr(style, 'hyphenationLang', None):
+            return True
+        return any(hasattr(f, 'cbDefn') or not hasattr(f, 'text') for f in self.frags)
+
+    def breakLines(self, width):
+        if self._use_default_breaker():
+            return Paragraph.breakLines(self, width)
+        # split으로 나뉜 앞부분은 이미 나눈 줄을 그대로 사용
+        if hasattr(self, 'blPara') and getattr(self, '_splitpara', 0):
+            return self.blPara
+        max_widths = width if isinstance(width, (list, tuple)) else [width]
+        self.height = 0
+        _handleBulletWidth(self.bulletText, self.style, max_widths)
+        blPara, self._width_max = line_breaker.break_frags(self.frags, max_widths)
+        return blPara
+
+    def _get_split_blParaFunc(self):
+        if getattr(self.blPara, 'kind', 0) == 1 and all(hasattr(l, 'joinFrags') for l in self.blPara.lines):
+            return _split_korean_lines
+        return Paragraph._get_split_blParaFunc(self)
+
+
+def _split_korean_lines(blPara, start, stop):
+    """break_frags 줄 -> split 앞/뒷부분의 frags
+
+    reportlab 기본(_split_blParaHard)은 줄 사이마다 띄어쓰기를 붙이고(<br/>은 사라지고
+    음절 사이 줄바꿈에는 없던 공백이 생김) 원래 frag의 text를 직접 고침.
+    줄을 끝낸 원래 문자(<br/>, 띄어쓰기)만 복제해서 이어 붙임
+    """
+    frags = []
+    lines = blPara.lines[start:stop]
+    for index, line in enumerate(lines):
+        frags.extend(frag.clone() for frag in line.words)
+        if index < len(lines) - 1:
+            frags.extend(frag.clone() for frag in line.joinFrags)
+    return frags
+
+
+def _overflow_lines(paragraph):
+    """줄 폭을 넘친 줄 수 (kind=0/1 모두)"""
+    count = 0
+    for line in paragraph.blPara.lines:
+        extra = line.extraSpace if hasattr(line, 'extraSpace') else line[0]
+        if extra < -_FUZZ:
+            count += 1
+    return count
+
+
+def _line_texts(paragraph):
+    """wrap된 문단 -> [(줄 텍스트, wordCount)] (kind=0/1 모두)"""
+    lines = []
+    for line in paragraph.blPara.lines:
+        if hasattr(line, 'words'):
+            lines.append((''.join(frag.text for frag in line.words), line.wordCount))
+        else:
+            lines.append((' '.join(line[1]), len(line[1])))
+    return lines
+
+
+def forced_break_mismatches(markup, style, width):
+    """<br/>이 든 문단을 reportlab Paragraph와 비교 -> 줄 텍스트/wordCount가 다른 [(줄 번호, 기본, 한국어)]"""
+    results = []
+    for paragraph_class in (Paragraph, KoreanParagraph):
+        paragraph = paragraph_class(markup, style)
+        paragraph.wrap(width, 10000)
+        results.append(_line_texts(paragraph))
+    return _diff_lines(*results)
+
+
+def split_mismatches(markup, style, width, first_lines):
+    """first_lines줄 높이에서 split한 앞/뒷부분의 줄을 나누지 않은 문단과 비교 -> [(줄 번호, 원래, split)]
+
+    <br/>, 띄어쓰기, 음절 사이 줄바꿈이 split 뒤에도 그대로 남는지 확인
+    """
+    whole = KoreanParagraph(markup, style)
+    whole.wrap(width, 10000)
+    parts = KoreanParagraph(markup, style).split(width, first_lines * style.leading + _FUZZ)
+    if not parts:
+        # 고아 줄 방지로 통째로 다음 페이지로 넘어감
+        return []
+    split_lines = []
+    for part in parts:
+        part.wrap(width, 10000)
+        split_lines.extend(_line_texts(part))
+    return _diff_lines(_line_texts(whole), split_lines)
+
+
+def _diff_lines(expected, actual):
+    mismatches = [(index, a, b) for index, (a, b) in enumerate(zip(expected, actual)) if a != b]
+    if len(expected) != len(actual):
+        mismatches.append((min(len(expected), len(actual)), expected[len(actual):], actual[len(expected):]))
+    return mismatches
+
+
+if __name__ == '__main__':
+    import create_business_plan_pdf as plan
+
+    parser = argparse.ArgumentParser(description='한국어 줄바꿈 벤치마크')
+    parser.add_argument('--paragraphs', type=int, default=200, help='문단 수')
+    parser.add_argument('--sentences', type=int, default=12, help='문단당 문장 수')
+    parser.add_argument('--repeat', type=int, default=5, help='같은 문단을 다시 레이아웃하는 횟수')
+    parser.add_argument('--width', type=float, default=170, help='줄 폭 (mm)')
+    args = parser.parse_args()
+
+    from reportlab.lib.units import mm
+
+    sentences = [
+        "오늘의마사지는 고객과 매장을 <b>연결</b>해주는 예약 플랫폼입니다.",
+        "예약, 결제, 채팅, 리뷰 등 모든 과정을 앱 하나로 처리합니다.",
+        "매장은 월 구독료 없이 예약 건당 수수료(10%)만 부담하며, 정산은 매월 2회(15일/말일) 진행됩니다.",
+        "PASS본인인증기반노쇼방지시스템으로 허위예약을 원천적으로 차단합니다.",
+        "1년차 목표는 매장 1,000개, 월 예약 30,000건, 연매출 12.5억 원입니다.",
+        "「고객 점수」는 방문 이력과 리뷰를 바탕으로 계산되며 매장에만 공개됩니다.",
+    ]
+    styles = plan.get_styles()
+    style = styles['BodyText']
+    texts = [' '.join(sentences[(i + j) % len(sentences)] for j in range(args.sentences)) + f" ({i})"
+             for i in range(args.paragraphs)]
+    width = args.width * mm
+
+    def run(paragraph_class):
+        paragraphs = [paragraph_class(text, style) for text in texts]
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for p in paragraphs:
+                p.wrap(width, 10000)
+        elapsed = time.perf_counter() - start
+        lines = sum(len(p.blPara.lines) for p in paragraphs)
+        overflow = sum(_overflow_lines(p) for p in paragraphs)
+        return elapsed, lines, overflow
+
+    print(f"문단 {args.paragraphs}개 x {args.repeat}회 레이아웃, 줄 폭 {args.width}mm, 폰트 {style.fontName}")
+    default = run(Paragraph)
+    print(f"  reportlab 기본      {default[0]:.3f}s  줄 {default[1]:>6}  넘친 줄 {default[2]}")
+    line_breaker.max_entries, limit = 0, line_breaker.max_entries
+    line_breaker.clear()
+    nomemo = run(KoreanParagraph)
+    print(f"  한국어 (캐시 없음)  {nomemo[0]:.3f}s  줄 {nomemo[1]:>6}  넘친 줄 {nomemo[2]}  ({default[0] / nomemo[0]:.2f}x)")
+    line_breaker.max_entries = limit
+    line_breaker.clear()
+    memo = run(KoreanParagraph)
+    print(f"  한국어 (캐시)       {memo[0]:.3f}s  줄 {memo[1]:>6}  넘친 줄 {memo[2]}  ({default[0] / memo[0]:.2f}x)")
+    print(f"  캐시 통계: {line_breaker.stats()}")
+
+    # 강제 줄바꿈 뒤 줄머리 띄어쓰기 처리가 기본 Paragraph와 같은지 (짧은 줄이라 줄바꿈 위치는 같아야 함)
+    br_samples = [
+        '<b>전국 14,000개 매장 입점</b><br/>\n    <b>70만 활성 고객</b><br/>\n    <b>연 GMV 4,000억원</b>',
+        '예약 <b>수수료</b> 10%<br/>  정산 월 2회<br/><br/>리뷰 보상',
+    ]
+    mismatched = [(markup, m) for markup in br_samples for m in forced_break_mismatches(markup, style, width)]
+    print(f"  <br/> 검사: {'일치' if not mismatched else f'불일치 {len(mismatched)}줄'}")
+    for markup, (index, expected, actual) in mismatched:
+        print(f"    {markup!r} 줄 {index}: 기본 {expected!r} / 한국어 {actual!r}")
+
+    # 페이지 경계에서 split해도 줄이 그대로인지 (<br/>, 음절 사이 줄바꿈, 어절 사이 줄바꿈)
+    split_samples = [
+        '<br/>'.join(f'line {i}' for i in range(120)),
+        'PASS본인인증기반노쇼방지시스템' * 40,
+        texts[0] + '<br/>' + texts[1],
+    ]
+    mismatched = [(markup, m) for markup in split_samples for first_lines in (1, 2, 5, 20)
+                  for m in split_mismatches(markup, style, width / 3, first_lines)]
+    print(f"  split 검사: {'일치' if not mismatched else f'불일치 {len(mismatched)}줄'}")
+    for markup, (index, expected, actual) in mismatched[:10]:
+        print(f"    {markup[:30]!r}... 줄 {index}: 원래 {expected!r} / split {actual!r}")
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Paragraph 파싱 결과 캐시
+같은 마크업 + 같은 스타일의 Paragraph를 반복 생성할 때 reportlab의
+마크업 파싱(ParaParser)을 한 번만 하고, 이후에는 파싱된 frags 복사본으로 생성
+
+벤치마크 (동업자별 문서 일괄 생성):
+    python scripts/pdf_paragraph_cache.py --documents 50
+"""
+
+import argparse
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from reportlab.lib.styles import PropertySet
+from reportlab.platypus import Paragraph
+
+
+def style_signature(style):
+    """스타일 속성값(부모 스타일 포함)으로 만든 hashable 지문"""
+    items = []
+    for name, value in sorted(vars(style).items()):
+        if isinstance(value, PropertySet):
+            value = style_signature(value)
+        else:
+            try:
+                hash(value)
+            except TypeError:
+                value = repr(value)
+        items.append((name, value))
+    return tuple(items)
+
+
+class ParagraphFactory:
+    """(마크업, 스타일, bulletText) 단위로 파싱 결과를 캐시하는 Paragraph 생성기
+
+    스타일은 속성값 지문으로 구분하므로 get_styles를 호출할 때마다 새로 만든
+    스타일끼리도 캐시를 공유함. 지문은 스타일 객체별로 처음 한 번만 계산하므로,
+    한 번 사용한 스타일 객체의 속성을 나중에 바꾸면 안 됨
+    (get_styles처럼 만들 때만 설정하는 경우는 안전).
+    max_entries를 넘으면 가장 오래 쓰지 않은 항목부터 제거하고,
+    0이면 캐시 없이 매번 파싱. paragraph_class로 Paragraph 하위 클래스를 만들 수 있음.
+    """
+
+    def __init__(self, max_entries=4096, paragraph_class=Paragraph):
+        self.max_entries = max_entries
+        self.paragraph_class = paragraph_class
+        self._entries = OrderedDict()
+        self._signatures = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, text, style=None, bulletText=None):
+        if self.max_entries <= 0 or style is None:
+            return self.paragraph_class(text, style, bulletText)
+
+        with self._lock:
+            signature = self._signatures.get(style)
+            if signature is None:
+                signature = self._signatures[style] = style_signature(style)
+            key = (text, signature, bulletText)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if entry is None:
+            paragraph = self.paragraph_class(text, style, bulletText)
+            # 반환하는 Paragraph와 frag 객체를 공유하지 않도록 복사본을 보관
+            entry = (paragraph.text, paragraph.style, paragraph.bulletText,
+                     [f.clone() for f in paragraph.frags])
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return paragraph
+
+        clean_text, parsed_style, bullet, frags = entry
+        # 레이아웃 중 frag 속성이 바뀌어도 캐시 원본에 영향이 없도록 frag 단위 복사
+        return self.paragraph_class(clean_text, parsed_style, bullet, frags=[f.clone() for f in frags])
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+if __name__ == '__main__':
+    import create_business_plan_pdf as plan
+
+    parser = argparse.ArgumentParser(description='Paragraph 캐시 일괄 생성 벤치마크')
+    parser.add_argument('--documents', type=int, default=50, help='생성할 문서 수 (동업자 수)')
+    parser.add_argument('--render', action='store_true', help='story 생성뿐 아니라 PDF 렌더링까지 측정')
+    args = parser.parse_args()
+
+    styles = plan.get_styles()
+
+    def run_batch():
+        start = time.perf_counter()
+        for _ in range(args.documents):
+            if args.render:
+                plan.render_pdf(plan.build_content(styles), cover=False)
+            else:
+                plan.build_content(styles)
+        return time.perf_counter() - start
+
+    factory = plan.cached_paragraph
+    factory.max_entries, limit = 0, factory.max_entries
+    uncached = run_batch()
+    factory.max_entries = limit
+    factory.clear()
+    cached = run_batch()
+
+    label = "PDF 렌더링" if args.render else "story 생성"
+    print(f"문서 {args.documents}개 {label}")
+    print(f"  캐시 없음: {uncached:.3f}s")
+    print(f"  캐시 사용: {cached:.3f}s ({uncached / cached:.2f}x)")
+    print(f"  캐시 통계: {factory.stats()}")
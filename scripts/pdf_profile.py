@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+flowable 단위 레이아웃 프로파일링
+wrap/split/drawOn 호출을 가로채 flowable별, 페이지별 시간과 호출 횟수를 기록
+create_table, create_highlight_box, create_stat_boxes가 만든 표는 헬퍼 이름으로,
+Paragraph는 스타일 이름으로 구분
+
+사용법:
+    python scripts/pdf_profile.py --output profile.json --top 20
+    python scripts/create_business_plan_pdf.py --profile profile.json
+"""
+
+import argparse
+import functools
+import io
+import json
+import time
+from contextlib import contextmanager
+
+from reportlab.platypus import Paragraph, SimpleDocTemplate
+from reportlab.platypus.flowables import Flowable
+
+PHASES = ('wrap', 'split', 'drawOn')
+# 보고서 키 이름
+_NAMES = {'wrap': 'wrap', 'split': 'split', 'drawOn': 'draw'}
+HELPERS = ('create_table', 'create_highlight_box', 'create_stat_boxes')
+
+
+def flowable_classes():
+    """Flowable과 현재 로드된 모든 하위 클래스"""
+    classes, pending = [], [Flowable]
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _label(flowable):
+    label = getattr(flowable, '_profile_label', None)
+    if label:
+        return label
+    if isinstance(flowable, Paragraph):
+        return f"Paragraph[{getattr(flowable.style, 'name', '?')}]"
+    return type(flowable).__name__
+
+
+def _preview(flowable):
+    if isinstance(flowable, Paragraph):
+        text = flowable.text
+    else:
+        cells = getattr(flowable, '_cellvalues', None)
+        text = cells[0][0] if cells and cells[0] else ''
+        if isinstance(text, (list, tuple)):
+            text = text[0] if text else ''
+        if isinstance(text, Paragraph):
+            text = text.text
+    text = ' '.join(str(text).split())
+    return text[:40]
+
+
+class FlowableProfiler:
+    """Frame이 직접 호출하는 wrap/split과 drawOn을 모든 Flowable 하위 클래스에서 가로챔
+
+    중첩 호출(표 안의 Paragraph)은 부모의 포함 시간(inclusive)에 들어가고,
+    자기 시간(self)에서는 빠짐. split으로 생긴 조각은 원래 flowable 기록에 합산.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.pages = {}
+        self.doc = None
+        self.page_offset = 0
+        self._stack = []
+        self._originals = []
+        self._start = time.perf_counter()
+
+    def _record(self, flowable):
+        record_id = getattr(flowable, '_profile_id', None)
+        if record_id is None:
+            record_id = len(self.records) + 1
+            flowable._profile_id = record_id
+        record = self.records.get(record_id)
+        if record is None:
+            record = self.records[record_id] = {
+                'id': record_id,
+                'label': _label(flowable),
+                'preview': _preview(flowable),
+                'parts': 1,
+                'pages': [],
+            }
+            for phase in PHASES:
+                record[f'{_NAMES[phase]}_calls'] = 0
+                record[f'{_NAMES[phase]}_s'] = 0.0
+                record[f'{_NAMES[phase]}_self_s'] = 0.0
+        return record
+
+    def _page(self):
+        page = self.page_offset + (self.doc.page if self.doc is not None else 0)
+        stats = self.pages.get(page)
+        if stats is None:
+            stats = self.pages[page] = {'page': page, 'start_s': time.perf_counter() - self._start,
+                                        'end_s': 0.0, 'calls': 0, 'flowables': {}}
+            for phase in PHASES:
+                stats[f'{_NAMES[phase]}_s'] = 0.0
+        return page, stats
+
+    def _timed(self, phase, func):
+        @functools.wraps(func)
+        def wrapper(flowable, *args, **kwargs):
+            # 하위 클래스가 super()로 같은 단계를 부르는 경우 한 번만 기록
+            if self._stack and self._stack[-1][0] is flowable and self._stack[-1][1] == phase:
+                return func(flowable, *args, **kwargs)
+            record = self._record(flowable)
+            page, page_stats = self._page()
+            frame = [flowable, phase, 0.0]
+            self._stack.append(frame)
+            start = time.perf_counter()
+            try:
+                result = func(flowable, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._stack.pop()
+                self_time = elapsed - frame[2]
+                if self._stack:
+                    self._stack[-1][2] += elapsed
+                record[f'{_NAMES[phase]}_calls'] += 1
+                record[f'{_NAMES[phase]}_s'] += elapsed
+                record[f'{_NAMES[phase]}_self_s'] += self_time
+                if page not in record['pages']:
+                    record['pages'].append(page)
+                page_stats[f'{_NAMES[phase]}_s'] += self_time
+                page_stats['calls'] += 1
+                page_stats['end_s'] = time.perf_counter() - self._start
+                page_stats['flowables'][record['id']] = page_stats['flowables'].get(record['id'], 0.0) + self_time
+            if phase == 'split' and result:
+                for part in result:
+                    part._profile_id = record['id']
+                record['parts'] += max(len(result) - 1, 0)
+            return result
+        return wrapper
+
+    def __enter__(self):
+        for cls in flowable_classes():
+            for phase in PHASES:
+                if phase in cls.__dict__:
+                    original = cls.__dict__[phase]
+                    self._originals.append((cls, phase, original))
+                    setattr(cls, phase, self._timed(phase, original))
+        return self
+
+    def __exit__(self, *exc):
+        for cls, phase, original in reversed(self._originals):
+            setattr(cls, phase, original)
+        self._originals = []
+
+    def report(self, top=20):
+        """순위(자기 시간 합계 기준) + 헬퍼/스타일별 합계 + 페이지별 타임라인"""
+        flowables = []
+        for record in self.records.values():
+            entry = dict(record)
+            entry['self_s'] = sum(record[f'{_NAMES[phase]}_self_s'] for phase in PHASES)
+            entry['calls'] = sum(record[f'{_NAMES[phase]}_calls'] for phase in PHASES)
+            flowables.append(entry)
+        flowables.sort(key=lambda r: r['self_s'], reverse=True)
+
+        by_label = {}
+        for entry in flowables:
+            agg = by_label.setdefault(entry['label'], {'label': entry['label'], 'count': 0, 'self_s': 0.0, 'calls': 0})
+            agg['count'] += 1
+            agg['self_s'] += entry['self_s']
+            agg['calls'] += entry['calls']
+
+        names = {entry['id']: entry['label'] for entry in flowables}
+        pages = []
+        for page in sorted(self.pages):
+            stats = dict(self.pages[page])
+            hot = sorted(stats.pop('flowables').items(), key=lambda kv: kv[1], reverse=True)[:3]
+            stats['hot'] = [{'id': fid, 'label': names[fid], 'self_s': round(t, 6)} for fid, t in hot]
+            pages.append(_rounded(stats))
+
+        return {
+            'total_s': round(time.perf_counter() - self._start, 6),
+            'flowables': [_rounded(entry) for entry in flowables[:top] if entry['calls']],
+            'by_label': [_rounded(agg) for agg in sorted(by_label.values(), key=lambda a: a['self_s'], reverse=True)],
+            'pages': pages,
+        }
+
+
+def _rounded(entry):
+    return {k: round(v, 6) if isinstance(v, float) else v for k, v in entry.items()}
+
+
+@contextmanager
+def labelled_helpers(plan):
+    """사업 계획서 헬퍼가 만든 flowable에 헬퍼 이름 표시 (프로파일 중에만)"""
+    originals = {name: getattr(plan, name) for name in HELPERS}
+
+    def labelled(name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            flowable = func(*args, **kwargs)
+            flowable._profile_label = name
+            return flowable
+        return wrapper
+
+    for name, func in originals.items():
+        setattr(plan, name, labelled(name, func))
+    try:
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(plan, name, func)
+
+
+def profile_pdf(plan, content=None, doc_options=None, top=20):
+    """render_pdf와 같은 섹션 단위 빌드를 캐시/병렬 없이 프로파일링 -> 보고서 dict"""
+    from pdf_sections import split_sections
+
+    options = dict(plan.DOC_OPTIONS, **(doc_options or {}))
+    with labelled_helpers(plan):
+        if content is None:
+            content = plan.build_content
+        story = content(plan.get_styles()) if callable(content) else list(content)
+
+    profiler = FlowableProfiler()
+    with profiler:
+        for section in split_sections(story):
+            doc = SimpleDocTemplate(io.BytesIO(), **options)
+            profiler.doc = doc
+            doc.build(section)
+            profiler.page_offset += doc.page
+    return profiler.report(top)
+
+
+def print_report(report, top=20):
+    print(f"전체 {report['total_s']:.3f}s, 페이지 {len(report['pages'])}개")
+    print("헬퍼/스타일별 (자기 시간):")
+    for agg in report['by_label']:
+        print(f"  {agg['label']:<28} {agg['self_s'] * 1000:9.2f}ms  flowable {agg['count']:>4}  호출 {agg['calls']:>5}")
+    print(f"느린 flowable 상위 {top}개:")
+    for entry in report['flowables'][:top]:
+        print(f"  #{entry['id']:<4} {entry['label']:<24} {entry['self_s'] * 1000:8.2f}ms  "
+              f"wrap {entry['wrap_calls']} / split {entry['split_calls']} / draw {entry['draw_calls']}  "
+              f"p{','.join(map(str, entry['pages']))}  {entry['preview']}")
+
+
+def write_report(report, output_path):
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"프로파일 저장: {output_path}")
+
+
+if __name__ == '__main__':
+    import create_business_plan_pdf as plan
+
+    parser = argparse.ArgumentParser(description='flowable 단위 레이아웃 프로파일링')
+    parser.add_argument('--output', help='JSON 보고서 저장 경로')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    report = profile_pdf(plan, top=args.top)
+    print_report(report, args.top)
+    if args.output:
+        write_report(report, args.output)
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+PDF 구조 회귀 검사
+pypdf로 각 페이지의 정규화된 content stream, 폰트, 리소스를 해시해 골든 매니페스트와 비교하고,
+해시가 달라진 페이지만 래스터화 (PyMuPDF 또는 poppler의 pdftoppm이 있을 때)
+
+사용법:
+    python scripts/pdf_regression.py record docs/golden --manifest golden.json
+    python scripts/pdf_regression.py check docs/out --manifest golden.json \\
+        --golden-dir docs/golden --raster-dir docs/regression
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, StreamObject
+
+try:
+    import pymupdf as fitz  # PyMuPDF (선택)
+except ImportError:
+    try:
+        import fitz
+    except ImportError:
+        fitz = None
+
+MANIFEST_VERSION = 1
+
+_SUBSET_PREFIX_RE = re.compile(r'^/[A-Z]{6}\+')
+# 스트림 길이/압축 방식은 내용이 같아도 달라질 수 있으므로 제외
+_IGNORED_STREAM_KEYS = {'/Length', '/Filter', '/DecodeParms'}
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _object_fingerprint(obj, memo, stack=frozenset()):
+    """리소스 객체 -> 비교용 구조 (임베디드 스트림은 디코딩한 데이터의 해시)
+
+    간접 객체 결과는 memo에 저장해, 여러 페이지가 공유하는 폰트/이미지는 문서당 한 번만 계산
+    """
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key in memo:
+            return memo[key]
+        if key in stack:
+            return '<ref>'
+        result = memo[key] = _object_fingerprint(obj.get_object(), memo, stack | {key})
+        return result
+    if isinstance(obj, StreamObject):
+        items = {k: v for k, v in obj.items() if k not in _IGNORED_STREAM_KEYS}
+        return ['stream', _sha256(obj.get_data()), _object_fingerprint(DictionaryObject(items), memo, stack)]
+    if isinstance(obj, DictionaryObject):
+        return [[k, _object_fingerprint(v, memo, stack)]
+                for k, v in sorted(obj.items()) if k != '/Parent']
+    if isinstance(obj, ArrayObject):
+        return [_object_fingerprint(v, memo, stack) for v in obj]
+    if isinstance(obj, NameObject):
+        # 폰트 서브셋 접두사(ABCDEF+)는 생성할 때마다 달라질 수 있음
+        return '/' + obj[8:] if _SUBSET_PREFIX_RE.match(obj) else str(obj)
+    return str(obj)
+
+
+def page_fingerprint(page, memo=None):
+    """페이지 하나의 해시 (content stream + 리소스 + 페이지 크기/회전)"""
+    contents = page.get_contents()
+    data = contents.get_data() if contents is not None else b''
+    # 공백/줄바꿈 차이는 무시
+    normalized = b' '.join(data.split())
+    payload = {
+        'content': _sha256(normalized),
+        'resources': _object_fingerprint(page.get('/Resources', DictionaryObject()), {} if memo is None else memo),
+        'mediabox': [float(v) for v in page.mediabox],
+        'rotate': int(page.get('/Rotate', 0)),
+    }
+    return _sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+
+
+def fingerprint_pdf(path, known_file_hash=None):
+    """PDF 파일 -> {'file_sha256', 'pages': [해시...]}
+
+    파일 전체 해시가 known_file_hash와 같으면 페이지 파싱을 건너뜀 (pages=None)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    file_hash = _sha256(data)
+    if file_hash == known_file_hash:
+        return {'file_sha256': file_hash, 'pages': None}
+    reader = PdfReader(io.BytesIO(data))
+    memo = {}
+    return {'file_sha256': file_hash, 'pages': [page_fingerprint(page, memo) for page in reader.pages]}
+
+
+def _fingerprint_job(job):
+    path, known_file_hash = job
+    try:
+        return fingerprint_pdf(path, known_file_hash)
+    except Exception as e:
+        return {'error': f'{type(e).__name__}: {e}'}
+
+
+def collect_pdfs(paths):
+    """파일/디렉터리 목록 -> (기준 디렉터리 상대 경로, 실제 경로) 리스트"""
+    found = []
+    for root in paths:
+        if os.path.isfile(root):
+            found.append((os.path.basename(root), root))
+            continue
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for name in filenames:
+                if name.lower().endswith('.pdf'):
+                    path = os.path.join(dirpath, name)
+                    found.append((os.path.relpath(path, root).replace(os.sep, '/'), path))
+    return sorted(found)
+
+
+def fingerprint_many(pdfs, known=None, workers=None):
+    """여러 PDF를 프로세스 풀에서 병렬 해시 -> {상대 경로: 결과}"""
+    known = known or {}
+    jobs = [(path, known.get(rel)) for rel, path in pdfs]
+    if workers == 1 or len(jobs) < 2:
+        results = map(_fingerprint_job, jobs)
+        return dict(zip((rel for rel, _path in pdfs), results))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_fingerprint_job, jobs, chunksize=max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 8)))
+        return dict(zip((rel for rel, _path in pdfs), results))
+
+
+def compare(manifest, results):
+    """매니페스트와 비교 -> {상대 경로: 달라진 내용}"""
+    documents = manifest.get('documents', {})
+    differences = {}
+    for rel, result in results.items():
+        golden = documents.get(rel)
+        if 'error' in result:
+            differences[rel] = {'error': result['error']}
+        elif golden is None:
+            differences[rel] = {'status': 'new'}
+        elif result['pages'] is None:
+            continue  # 파일 해시 동일
+        else:
+            old_pages, new_pages = golden['pages'], result['pages']
+            changed = [i for i in range(max(len(old_pages), len(new_pages)))
+                       if i >= len(old_pages) or i >= len(new_pages) or old_pages[i] != new_pages[i]]
+            if changed:
+                differences[rel] = {'status': 'changed', 'pages': changed,
+                                    'page_count': [len(old_pages), len(new_pages)]}
+    for rel in documents:
+        if rel not in results:
+            differences[rel] = {'status': 'missing'}
+    return differences
+
+
+def rasterize_page(pdf_path, page_index, output_png, dpi=72):
+    """페이지 하나를 PNG로 저장 (PyMuPDF -> pdftoppm 순서로 시도). 실패하면 False"""
+    if fitz is not None:
+        with fitz.open(pdf_path) as doc:
+            if page_index >= doc.page_count:
+                return False
+            doc[page_index].get_pixmap(dpi=dpi).save(output_png)
+        return True
+    if shutil.which('pdftoppm'):
+        prefix = os.path.splitext(output_png)[0]
+        page = str(page_index + 1)
+        result = subprocess.run(['pdftoppm', '-f', page, '-l', page, '-r', str(dpi), '-png', '-singlefile',
+                                 pdf_path, prefix], capture_output=True)
+        return result.returncode == 0 and os.path.exists(output_png)
+    return False
+
+
+def _pixel_diff(golden_png, new_png, diff_png):
+    """두 래스터 이미지의 다른 픽셀 수 (Pillow 필요), 차이 이미지 저장"""
+    from PIL import Image, ImageChops
+
+    with Image.open(golden_png) as a, Image.open(new_png) as b:
+        a, b = a.convert('RGB'), b.convert('RGB')
+        if a.size != b.size:
+            return {'size': [a.size, b.size]}
+        diff = ImageChops.difference(a, b)
+        mask = diff.convert('L').point(lambda v: 255 if v else 0)
+        changed = mask.histogram()[255]
+        if changed:
+            diff.save(diff_png)
+        return {'changed_pixels': changed, 'bbox': mask.getbbox()}
+
+
+def rasterize_differences(differences, pdfs, raster_dir, golden_dir=None, dpi=72):
+    """해시가 달라진 페이지만 래스터화 (골든 PDF가 있으면 픽셀 차이도 계산)"""
+    paths = dict(pdfs)
+    os.makedirs(raster_dir, exist_ok=True)
+    for rel, diff in differences.items():
+        if diff.get('status') != 'changed':
+            continue
+        base = os.path.join(raster_dir, rel.replace('/', '__')[:-4])
+        golden_pdf = os.path.join(golden_dir, rel) if golden_dir else None
+        diff['rasters'] = {}
+        for index in diff['pages']:
+            new_png = f'{base}.p{index + 1}.new.png'
+            if not rasterize_page(paths[rel], index, new_png, dpi):
+                diff['rasters'][index] = 'rasterizer unavailable'
+                continue
+            entry = {'new': new_png}
+            if golden_pdf and os.path.exists(golden_pdf):
+                golden_png = f'{base}.p{index + 1}.golden.png'
+                if rasterize_page(golden_pdf, index, golden_png, dpi):
+                    entry['golden'] = golden_png
+                    entry.update(_pixel_diff(golden_png, new_png, f'{base}.p{index + 1}.diff.png'))
+            diff['rasters'][index] = entry
+
+
+def record(paths, manifest_path, workers=None):
+    pdfs = collect_pdfs(paths)
+    results = fingerprint_many(pdfs, workers=workers)
+    errors = {rel: r['error'] for rel, r in results.items() if 'error' in r}
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'documents': {rel: r for rel, r in results.items() if 'error' not in r},
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    for rel, error in errors.items():
+        print(f"[오류] {rel}: {error}")
+    print(f"매니페스트 기록: {manifest_path} (PDF {len(manifest['documents'])}개)")
+    return manifest
+
+
+def check(paths, manifest_path, workers=None, raster_dir=None, golden_dir=None, dpi=72):
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"지원하지 않는 매니페스트 버전: {manifest.get('version')}")
+
+    start = time.perf_counter()
+    pdfs = collect_pdfs(paths)
+    known = {rel: doc['file_sha256'] for rel, doc in manifest['documents'].items()}
+    results = fingerprint_many(pdfs, known, workers)
+    differences = compare(manifest, results)
+    hashed = time.perf_counter() - start
+
+    if raster_dir and differences:
+        rasterize_differences(differences, pdfs, raster_dir, golden_dir, dpi)
+
+    skipped = sum(1 for r in results.values() if r.get('pages') is None and 'error' not in r)
+    print(f"PDF {len(pdfs)}개 검사: {hashed:.2f}s (파일 해시 동일로 건너뜀 {skipped}개)")
+    for rel, diff in sorted(differences.items()):
+        print(f"  {rel}: {json.dumps(diff, ensure_ascii=False, default=str)}")
+    if not differences:
+        print("골든 매니페스트와 일치")
+    return differences
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='PDF 구조 회귀 검사')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = sub.add_parser('record', help='골든 매니페스트 기록')
+    record_parser.add_argument('paths', nargs='+', help='PDF 파일 또는 디렉터리')
+    record_parser.add_argument('--manifest', required=True)
+    record_parser.add_argument('--workers', type=int, default=None)
+
+    check_parser = sub.add_parser('check', help='매니페스트와 비교')
+    check_parser.add_argument('paths', nargs='+', help='PDF 파일 또는 디렉터리')
+    check_parser.add_argument('--manifest', required=True)
+    check_parser.add_argument('--workers', type=int, default=None)
+    check_parser.add_argument('--raster-dir', help='달라진 페이지 PNG 저장 위치')
+    check_parser.add_argument('--golden-dir', help='골든 PDF 디렉터리 (있으면 픽셀 차이 계산)')
+    check_parser.add_argument('--dpi', type=int, default=72)
+
+    args = parser.parse_args()
+    if args.command == 'record':
+        record(args.paths, args.manifest, args.workers)
+    else:
+        differences = check(args.paths, args.manifest, args.workers, args.raster_dir, args.golden_dir, args.dpi)
+        sys.exit(1 if differences else 0)
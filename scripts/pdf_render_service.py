@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""
+PDF 렌더링 로컬 HTTP 서비스
+폰트 등록과 get_styles가 끝난 워커 프로세스 풀을 유지하고,
+JSON 문서 요청을 PDF로 렌더링 (동일 요청 합치기 + 최근 결과 캐시)
+
+사용법:
+    python scripts/pdf_render_service.py serve --port 8765 --workers 4
+    python scripts/pdf_render_service.py load-test --url http://127.0.0.1:8765 --requests 200
+
+엔드포인트:
+    POST /render   JSON 문서 -> application/pdf
+    GET  /metrics  큐 길이, 캐시/합치기 횟수, p50/p95/p99 지연시간 (JSON)
+    GET  /health
+
+요청 형식 (blocks를 생략하면 사업 계획서 본문 전체):
+    {"cover": true, "blocks": [
+        {"type": "section", "text": "1. 제목"},
+        {"type": "subsection", "text": "1.1 소제목"},
+        {"type": "paragraph", "text": "본문", "style": "BodyText"},
+        {"type": "bullets", "items": ["항목1", "항목2"]},
+        {"type": "table", "data": [["항목", "내용"], ["a", "b"]], "col_widths_mm": [50, 110]},
+        {"type": "highlight", "text": "<b>강조</b>"},
+        {"type": "stats", "items": [["2조원", "시장 규모"], ["96%", "개발 완료"]]},
+        {"type": "spacer", "height_mm": 8},
+        {"type": "page_break"}
+    ]}
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BLOCK_TYPES = {
+    'section', 'subsection', 'paragraph', 'bullets', 'table',
+    'highlight', 'stats', 'spacer', 'page_break',
+}
+
+# 워커 프로세스별 준비된 상태 (_warm_worker에서 채움)
+_plan = None
+_styles = None
+
+
+@functools.lru_cache(maxsize=1)
+def style_names():
+    """paragraph 블록에 쓸 수 있는 스타일 이름 (get_styles 키)"""
+    import create_business_plan_pdf as plan
+    return frozenset(plan.get_styles().byName)
+
+
+@functools.lru_cache(maxsize=1)
+def frame_height_mm():
+    """본문 Frame 높이 (mm). 이보다 큰 spacer는 어느 페이지에도 들어가지 않아 LayoutError"""
+    import create_business_plan_pdf as plan
+    from reportlab.lib.units import mm
+    options = plan.DOC_OPTIONS
+    # SimpleDocTemplate의 Frame은 위/아래 padding이 6pt씩
+    return (options['pagesize'][1] - options['topMargin'] - options['bottomMargin'] - 12) / mm
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_spec(spec):
+    """요청 문서 구조 검사 (잘못되면 ValueError)
+
+    워커에서 KeyError/TypeError/LayoutError로 실패할 입력(없는 스타일, 쌍이 아닌 stats 항목,
+    불리언이 아닌 cover, 열 수가 다른 표, 페이지보다 높은 spacer)을 미리 걸러 400으로 응답
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("요청 본문은 JSON 객체여야 합니다")
+    if not isinstance(spec.get('cover', True), bool):
+        raise ValueError("cover는 true/false여야 합니다")
+    blocks = spec.get('blocks')
+    if blocks is None:
+        return
+    if not isinstance(blocks, list):
+        raise ValueError("blocks는 배열이어야 합니다")
+    for i, block in enumerate(blocks):
+        if not isinstance(block, dict) or block.get('type') not in BLOCK_TYPES:
+            raise ValueError(f"blocks[{i}]: 알 수 없는 블록 type")
+        kind = block['type']
+        if kind in ('section', 'subsection', 'paragraph', 'highlight') and not isinstance(block.get('text'), str):
+            raise ValueError(f"blocks[{i}]: text가 필요합니다")
+        style = block.get('style', 'BodyText')
+        if kind == 'paragraph' and (not isinstance(style, str) or style not in style_names()):
+            raise ValueError(f"blocks[{i}]: 알 수 없는 style {block.get('style')!r}")
+        if kind in ('bullets', 'stats') and not isinstance(block.get('items'), list):
+            raise ValueError(f"blocks[{i}]: items 배열이 필요합니다")
+        if kind == 'stats' and not all(isinstance(item, list) and len(item) == 2
+                                       and all(isinstance(v, str) for v in item) for item in block['items']):
+            raise ValueError(f"blocks[{i}]: stats items는 [값, 설명] 문자열 쌍이어야 합니다")
+        if kind == 'table':
+            data = block.get('data')
+            if not isinstance(data, list) or not data or not all(isinstance(row, list) for row in data):
+                raise ValueError(f"blocks[{i}]: data는 2차원 배열이어야 합니다")
+            width = len(data[0])
+            if not width or any(len(row) != width for row in data):
+                raise ValueError(f"blocks[{i}]: data의 모든 행은 열 수가 같아야 합니다")
+            widths = block.get('col_widths_mm')
+            if widths is not None and (not isinstance(widths, list) or len(widths) != width
+                                       or not all(_is_number(w) and w > 0 for w in widths)):
+                raise ValueError(f"blocks[{i}]: col_widths_mm는 열 수만큼의 양수 배열이어야 합니다")
+        if kind == 'spacer':
+            height = block.get('height_mm', 5)
+            limit = frame_height_mm()
+            if not _is_number(height) or not 0 <= height <= limit:
+                raise ValueError(f"blocks[{i}]: height_mm는 0 이상 {limit:.0f} 이하의 숫자여야 합니다")
+
+
+def spec_key(spec):
+    """요청 내용 해시 (키 순서와 공백에 무관)"""
+    data = json.dumps(spec, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def story_from_spec(spec, plan, styles):
+    """JSON 블록 -> 사업 계획서 헬퍼로 만든 flowable 리스트"""
+    from reportlab.lib.units import mm
+    from reportlab.platypus import Spacer, PageBreak
+
+    blocks = spec.get('blocks')
+    if blocks is None:
+        return plan.build_content(styles)
+
+    story = []
+    for block in blocks:
+        kind = block['type']
+        if kind == 'section':
+            story.append(plan.cached_paragraph(block['text'], styles['SectionTitle']))
+        elif kind == 'subsection':
+            story.append(plan.cached_paragraph(block['text'], styles['SubsectionTitle']))
+        elif kind == 'paragraph':
+            story.append(plan.cached_paragraph(block['text'], styles[block.get('style', 'BodyText')]))
+        elif kind == 'bullets':
+            for item in block['items']:
+                story.append(plan.cached_paragraph(f"• {item}", styles['BulletPoint']))
+        elif kind == 'table':
+            data = [[str(cell) for cell in row] for row in block['data']]
+            widths = block.get('col_widths_mm') or [160 / len(data[0])] * len(data[0])
+            story.append(plan.create_table(data, [w*mm for w in widths], block.get('header', True)))
+        elif kind == 'highlight':
+            story.append(plan.create_highlight_box(block['text'], styles))
+        elif kind == 'stats':
+            story.append(plan.create_stat_boxes([tuple(item) for item in block['items']], styles))
+        elif kind == 'spacer':
+            story.append(Spacer(1, block.get('height_mm', 5)*mm))
+        elif kind == 'page_break':
+            story.append(PageBreak())
+    return story
+
+
+def _warm_worker():
+    """워커 시작 시 reportlab 임포트, 한글 폰트 등록, 스타일 시트 생성을 미리 수행"""
+    global _plan, _styles
+    import create_business_plan_pdf as plan
+    _plan = plan
+    _styles = plan.get_styles()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _render_job(spec):
+    story = story_from_spec(spec, _plan, _styles)
+    return _plan.render_pdf(story, cover=spec.get('cover', True))
+
+
+def percentile(samples, pct):
+    """nearest-rank 백분위수"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(math.ceil(pct / 100.0 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class RenderService:
+    """워커 풀 + 동일 요청 합치기 + 결과 LRU 캐시 + 지표"""
+
+    def __init__(self, workers=None, cache_size=64, latency_window=2048):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._cache = OrderedDict()
+        self._latencies = deque(maxlen=latency_window)
+        self._waiting = 0
+        self.counters = {'requests': 0, 'rendered': 0, 'cache_hits': 0, 'coalesced': 0, 'errors': 0}
+
+    def warm_up(self):
+        """워커 프로세스를 모두 띄워 초기화까지 끝내 둠 (요청 검사용 스타일 이름/Frame 높이도 미리 계산)"""
+        style_names()
+        frame_height_mm()
+        futures = [self.executor.submit(_ping) for _ in range(self.workers)]
+        wait(futures)
+        return sorted({f.result() for f in futures})
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.exception() is not None:
+                return
+            self.counters['rendered'] += 1
+            if self.cache_size > 0:
+                self._cache[key] = future.result()
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def render(self, spec):
+        """spec -> (PDF bytes, 'cache' | 'coalesced' | 'rendered')"""
+        validate_spec(spec)
+        key = spec_key(spec)
+        start = time.perf_counter()
+        with self._lock:
+            self.counters['requests'] += 1
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                self.counters['cache_hits'] += 1
+                self._latencies.append(time.perf_counter() - start)
+                return data, 'cache'
+            future = self._inflight.get(key)
+            if future is not None:
+                source = 'coalesced'
+                self.counters['coalesced'] += 1
+            else:
+                source = 'rendered'
+                future = self.executor.submit(_render_job, spec)
+                self._inflight[key] = future
+            self._waiting += 1
+        if source == 'rendered':
+            # 이미 끝난 future면 콜백이 즉시 실행되므로 락 밖에서 등록
+            future.add_done_callback(lambda f, key=key: self._finish(key, f))
+        try:
+            data = future.result()
+        except Exception:
+            with self._lock:
+                self.counters['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+        return data, source
+
+    def metrics(self):
+        with self._lock:
+            samples = list(self._latencies)
+            result = dict(self.counters)
+            result.update({
+                'workers': self.workers,
+                'queue_depth': len(self._inflight),
+                'waiting_requests': self._waiting,
+                'cached_outputs': len(self._cache),
+            })
+        for pct in (50, 95, 99):
+            value = percentile(samples, pct)
+            result[f'p{pct}_ms'] = None if value is None else round(value * 1000, 2)
+        result['latency_samples'] = len(samples)
+        return result
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'PdfRenderService/1.0'
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_json(200, self.server.service.metrics())
+        elif self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/render':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            spec = json.loads(self.rfile.read(length) or b'{}')
+            data, source = self.server.service.render(spec)
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f'렌더링 실패: {e}'})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('X-Render-Source', source)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def serve(host='127.0.0.1', port=8765, workers=None, cache_size=64, verbose=False):
+    service = RenderService(workers, cache_size)
+    pids = service.warm_up()
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    print(f"PDF 렌더링 서비스 시작: http://{host}:{port} (워커 {len(pids)}개 준비 완료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+def _load_test_spec(i, distinct):
+    n = i % distinct
+    return {
+        'cover': False,
+        'blocks': [
+            {'type': 'section', 'text': f"{n + 1}. 부하 테스트 문서"},
+            {'type': 'stats', 'items': [[f"{n}억", "매출"], ["96%", "개발 완료"]]},
+            {'type': 'table', 'data': [["항목", "내용"]] + [[f"행 {r}", f"값 {r * n}"] for r in range(8)],
+             'col_widths_mm': [50, 110]},
+            {'type': 'bullets', 'items': [f"항목 {k}" for k in range(5)]},
+            {'type': 'highlight', 'text': f"<b>문서 {n}</b> 하이라이트"},
+        ],
+    }
+
+
+def load_test(url, requests=200, concurrency=16, distinct=20):
+    """로컬 서비스에 동시 요청을 보내 처리량과 지연시간 측정"""
+    def send(i):
+        body = json.dumps(_load_test_spec(i, distinct)).encode('utf-8')
+        req = urllib.request.Request(f"{url}/render", data=body, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as resp:
+                resp.read()
+                source = resp.headers.get('X-Render-Source')
+        except urllib.error.URLError as e:
+            return time.perf_counter() - start, f'error: {e}'
+        return time.perf_counter() - start, source
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _source in results]
+    sources = {}
+    for _latency, source in results:
+        sources[source] = sources.get(source, 0) + 1
+    print(f"요청 {requests}건 / 동시 {concurrency} / 고유 문서 {distinct}개: {elapsed:.2f}s "
+          f"({requests / elapsed:.1f} req/s)")
+    print("클라이언트 지연시간: " + ", ".join(
+        f"p{pct} {percentile(latencies, pct) * 1000:.1f}ms" for pct in (50, 95, 99)))
+    print(f"응답 출처: {sources}")
+    with urllib.request.urlopen(f"{url}/metrics") as resp:
+        print(f"서버 지표: {json.loads(resp.read())}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='PDF 렌더링 로컬 서비스')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = sub.add_parser('serve', help='서비스 실행')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--workers', type=int, default=None, help='워커 프로세스 수 (기본: CPU 수)')
+    serve_parser.add_argument('--cache-size', type=int, default=64, help='캐시할 최근 결과 수')
+    serve_parser.add_argument('--verbose', action='store_true', help='요청 로그 출력')
+
+    load_parser = sub.add_parser('load-test', help='로컬 서비스 부하 테스트')
+    load_parser.add_argument('--url', default='http://127.0.0.1:8765')
+    load_parser.add_argument('--requests', type=int, default=200)
+    load_parser.add_argument('--concurrency', type=int, default=16)
+    load_parser.add_argument('--distinct', type=int, default=20, help='서로 다른 문서 수')
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers, args.cache_size, args.verbose)
+    else:
+        load_test(args.url, args.requests, args.concurrency, args.distinct)
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+"""
+섹션 단위 PDF 렌더링 캐시
+build_content 스타일의 story를 PageBreak 기준으로 섹션으로 나누고,
+섹션별 내용/스타일/폰트 해시로 렌더링 결과를 캐시한 뒤 하나의 PDF로 조립
+캐시에 없는 섹션은 프로세스 풀에서 병렬로 레이아웃 가능
+섹션을 렌더링하면서 제목 위치를 기록해 두므로, 목차와 북마크(outline)를
+multiBuild 반복 레이아웃 없이 조립 단계에서 만듦
+
+병렬 속도 측정:
+    python scripts/pdf_sections.py --bench --copies 20 --workers 1 2 4 8
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import types
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import Fit
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, PageBreak, Paragraph, Image
+
+# 렌더링 방식이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_VERSION = 3
+
+# 섹션 캐시 최대 항목 수 (넘으면 오래 사용하지 않은 항목부터 삭제)
+DEFAULT_CACHE_ENTRIES = 256
+
+# 목차/북마크로 기록할 Paragraph 스타일 -> 단계 (0: 섹션, 1: 하위 섹션)
+HEADING_STYLES = {'SectionTitle': 0, 'SubsectionTitle': 1}
+
+# 재현 가능 모드에서 SOURCE_DATE_EPOCH가 없을 때 쓰는 시각 (reportlab invariant와 같은 2000-01-01 UTC)
+DEFAULT_SOURCE_DATE_EPOCH = 946684800
+
+_ADDRESS_RE = re.compile(r' at 0x[0-9a-fA-F]+')
+
+# binary_streams 상태: 블록 안에 있는 스레드 수와 첫 스레드가 들어오기 전 useA85 값
+_a85_lock = threading.Lock()
+_a85_users = 0
+_a85_saved = None
+
+
+@contextmanager
+def binary_streams():
+    """블록 안에서 rl_config.useA85를 끔
+
+    pypdf로 다시 쓸 PDF(섹션, 표지, 목차, 오버레이)는 이미지 스트림을 ASCII85 텍스트로
+    감쌀 필요가 없음 (약 25% 작아짐).
+    useA85는 프로세스 전역이라 여러 스레드가 동시에 렌더링하면 서로의 저장 값을 덮어쓰므로,
+    잠금 아래에서 사용 중인 블록 수를 세어 처음 들어올 때 저장하고 마지막으로 나갈 때만 되돌림.
+    블록이 하나라도 열려 있는 동안에는 같은 프로세스의 다른 reportlab 출력도 useA85=0으로 만들어짐
+    """
+    global _a85_users, _a85_saved
+    with _a85_lock:
+        if _a85_users == 0:
+            _a85_saved = rl_config.useA85
+            rl_config.useA85 = 0
+        _a85_users += 1
+    try:
+        yield
+    finally:
+        with _a85_lock:
+            _a85_users -= 1
+            if _a85_users == 0:
+                rl_config.useA85 = _a85_saved
+
+
+def split_sections(story):
+    """PageBreak 기준으로 story를 섹션 리스트로 분리"""
+    sections = [[]]
+    for flowable in story:
+        if isinstance(flowable, PageBreak):
+            sections.append([])
+        else:
+            sections[-1].append(flowable)
+    return [section for section in sections if section]
+
+
+def _fingerprint(obj, seen):
+    """flowable/스타일/값을 JSON 직렬화 가능한 구조로 변환"""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, bytes):
+        return hashlib.sha256(obj).hexdigest()
+    if isinstance(obj, (list, tuple)):
+        return [_fingerprint(item, seen) for item in obj]
+    if isinstance(obj, dict):
+        return [[str(k), _fingerprint(v, seen)] for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))]
+    if isinstance(obj, (type, types.FunctionType, types.MethodType, types.BuiltinFunctionType)):
+        return getattr(obj, '__qualname__', type(obj).__name__)
+    if hasattr(obj, 'hexval'):
+        # reportlab Color
+        return obj.hexval() + ':%s' % getattr(obj, 'alpha', 1)
+    if isinstance(obj, Image):
+        # 파일 객체/ImageReader 내부 상태 대신 이미지 데이터 해시 + 그리기 크기
+        return ['Image', _image_digest(obj), obj.drawWidth, obj.drawHeight, obj.hAlign, obj._mask]
+    if isinstance(obj, Paragraph):
+        # frags는 text + style에서 파생되므로 제외
+        # 하위 클래스(KoreanParagraph 등)는 줄바꿈이 다르므로 클래스 이름도 포함
+        return [type(obj).__name__, obj.text, _fingerprint(obj.style, seen), _fingerprint(obj.bulletText, seen)]
+
+    if id(obj) in seen:
+        return ['<cycle>', type(obj).__name__]
+    seen.add(id(obj))
+    try:
+        if hasattr(obj, '__dict__'):
+            return [type(obj).__name__, _fingerprint(vars(obj), seen)]
+        return [type(obj).__name__, _ADDRESS_RE.sub('', repr(obj))]
+    finally:
+        seen.discard(id(obj))
+
+
+def _image_digest(image):
+    digest = getattr(image, 'content_digest', None)
+    if digest:
+        return digest
+    source = getattr(getattr(image, '_img', None), 'fp', None) or image._file
+    if isinstance(source, io.BytesIO):
+        return hashlib.sha256(source.getvalue()).hexdigest()
+    if isinstance(image.filename, str) and os.path.exists(image.filename):
+        with open(image.filename, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    return _ADDRESS_RE.sub('', repr(image.filename))
+
+
+def flowable_fingerprint(flowable):
+    """flowable 하나의 내용/스타일 지문"""
+    return _fingerprint(flowable, set())
+
+
+def font_fingerprint():
+    """등록된 TTF 폰트 파일 정보 (파일이 바뀌면 캐시 무효화)"""
+    fonts = []
+    for name in sorted(pdfmetrics.getRegisteredFontNames()):
+        face = getattr(pdfmetrics.getFont(name), 'face', None)
+        filename = getattr(face, 'filename', None)
+        if filename and os.path.exists(filename):
+            st = os.stat(filename)
+            fonts.append([name, filename, st.st_size, st.st_mtime_ns])
+    return fonts
+
+
+def section_key(section, doc_options, fonts=None):
+    """섹션 캐시 키 (내용 + 스타일 + 페이지 설정 + 폰트 해시)"""
+    payload = {
+        'version': CACHE_VERSION,
+        'doc': _fingerprint(doc_options, set()),
+        'fonts': font_fingerprint() if fonts is None else fonts,
+        'flowables': [flowable_fingerprint(f) for f in section],
+    }
+    data = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class SectionCache:
+    """섹션 렌더링 결과 디스크 캐시 (<key>.pdf + <key>.json)
+
+    읽을 때마다 메타 파일 수정 시각을 갱신하고, 항목이 max_entries를 넘으면
+    가장 오래 사용하지 않은 항목부터 삭제 (감시 모드에서 편집할 때마다 쌓이지 않도록)
+    """
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_CACHE_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.pdf', base + '.json'
+
+    def get(self, key):
+        pdf_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(pdf_path, 'rb') as f:
+                data = f.read()
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+        return data, meta
+
+    def put(self, key, data, meta):
+        pdf_path, meta_path = self._paths(key)
+        # PDF를 먼저 쓰고 메타를 마지막에 써서, 메타가 있으면 PDF도 완전한 상태
+        for path, content, mode in ((pdf_path, data, 'wb'),
+                                    (meta_path, json.dumps(meta), 'w')):
+            tmp_path = path + '.tmp'
+            with open(tmp_path, mode) as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+    def prune(self, keep=()):
+        """max_entries개만 남기고 오래 사용하지 않은 항목 삭제 (keep의 키는 유지) -> 삭제 수"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            key, ext = os.path.splitext(name)
+            if ext == '.json' and key not in keep:
+                try:
+                    entries.append((os.stat(os.path.join(self.cache_dir, name)).st_mtime_ns, key))
+                except OSError:
+                    continue
+        excess = len(entries) + len(keep) - self.max_entries
+        if excess <= 0:
+            return 0
+        entries.sort()
+        for _mtime, key in entries[:excess]:
+            # 메타를 먼저 지워 get이 PDF 없는 항목을 읽지 않도록
+            for path in reversed(self._paths(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return min(excess, len(entries))
+
+
+def render_section(section, doc_options):
+    """섹션 하나를 헤더/푸터 없이 렌더링 -> (PDF bytes, 메타)
+
+    메타의 headings: HEADING_STYLES 제목마다 [단계, 제목, 섹션 내 페이지(0부터), 제목 윗변 y]
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, **doc_options)
+    headings = []
+
+    def record_heading(flowable):
+        level = HEADING_STYLES.get(getattr(getattr(flowable, 'style', None), 'name', None))
+        if level is not None and isinstance(flowable, Paragraph):
+            # Frame은 그린 뒤 _y를 (아랫변 - spaceAfter)로 옮김
+            top = doc.frame._y + flowable.getSpaceAfter() + flowable.height
+            headings.append([level, flowable.getPlainText(), doc.page - 1, round(top, 2)])
+
+    doc.afterFlowable = record_heading
+    with binary_streams():
+        doc.build(list(section))
+    return buffer.getvalue(), {'page_count': doc.page, 'headings': headings}
+
+
+def _init_worker(fonts):
+    """워커 프로세스에 부모와 같은 TTF 폰트 등록 (spawn 방식에서는 상속되지 않음)"""
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    for name, filename in fonts:
+        if name not in registered:
+            pdfmetrics.registerFont(TTFont(name, filename))
+
+
+def _render_job(job):
+    section, doc_options = job
+    return render_section(section, doc_options)
+
+
+def render_sections(sections, doc_options, cache=None, workers=1):
+    """변경된 섹션만 렌더링 -> ([(PDF bytes, 메타)], 재사용 수)
+
+    workers > 1이면 캐시에 없는 섹션들을 프로세스 풀에서 병렬 레이아웃.
+    각 섹션의 페이지 수가 메타로 돌아오므로, 전체 페이지 번호는
+    assemble_pdf에서 섹션 순서대로 누적해 매김.
+    """
+    fonts = font_fingerprint()
+    keys = [section_key(section, doc_options, fonts) for section in sections]
+    results = [cache.get(key) if cache else None for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if workers > 1 and len(missing) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(missing)),
+            initializer=_init_worker,
+            initargs=([(name, filename) for name, filename, _size, _mtime in fonts],)
+        ) as pool:
+            rendered = list(pool.map(_render_job, [(sections[i], doc_options) for i in missing]))
+    else:
+        rendered = [render_section(sections[i], doc_options) for i in missing]
+
+    for i, result in zip(missing, rendered):
+        if cache:
+            cache.put(keys[i], *result)
+        results[i] = result
+    if cache and missing:
+        cache.prune(keep=set(keys))
+    return results, len(sections) - len(missing)
+
+
+def source_date_epoch():
+    """SOURCE_DATE_EPOCH 환경 변수(초), 없으면 DEFAULT_SOURCE_DATE_EPOCH"""
+    value = os.environ.get('SOURCE_DATE_EPOCH')
+    return int(value) if value else DEFAULT_SOURCE_DATE_EPOCH
+
+
+def pdf_date(epoch):
+    """epoch 초 -> PDF 날짜 문자열 (UTC)"""
+    return time.strftime("D:%Y%m%d%H%M%S+00'00'", time.gmtime(epoch))
+
+
+def _render_overlay(page_count, decorate_page, pagesize, first_page_number=1):
+    """페이지마다 헤더/푸터만 그린 오버레이 PDF (decorate_page(c, 쪽 번호))"""
+    buffer = io.BytesIO()
+    with binary_streams():
+        c = canvas.Canvas(buffer, pagesize=pagesize)
+        for index in range(page_count):
+            decorate_page(c, first_page_number + index)
+            c.showPage()
+        c.save()
+    return PdfReader(io.BytesIO(buffer.getvalue()))
+
+
+def collect_headings(sections):
+    """섹션 메타의 제목들 -> [(단계, 제목, 본문 페이지 인덱스, y)] (본문 첫 페이지 = 0)"""
+    headings = []
+    offset = 0
+    for _data, meta in sections:
+        for level, title, page, top in meta.get('headings', []):
+            headings.append((level, title, offset + page, top))
+        offset += meta['page_count']
+    return headings
+
+
+def assemble_pdf(cover, sections, decorate_page=None, pagesize=A4, output=None, reproducible=False,
+                 toc=None, outline=True):
+    """표지 + 섹션 PDF들을 순서대로 병합하고 본문 페이지에 헤더/푸터 적용
+
+    decorate_page(c, 쪽 번호)의 쪽 번호는 표지/목차를 포함한 물리 페이지 번호(1부터)라서
+    목차에 적힌 번호와 푸터 번호가 같음
+
+    toc(headings, first_page) -> PDF bytes를 주면 표지 뒤에 목차 페이지를 넣음.
+    first_page는 목차가 들어갈 0부터 센 위치이고, 목차 쪽수는 항목 수만으로 정해지므로
+    본문 레이아웃을 다시 하지 않고 한 번에 쪽 번호를 매길 수 있음.
+    outline이면 제목마다 해당 위치로 이동하는 북마크를 추가
+
+    output(쓰기 가능한 스트림)을 주면 그곳에 기록하고 output을, 아니면 bytes를 반환
+    reproducible이면 생성 시각을 SOURCE_DATE_EPOCH로 고정하고 문서 ID를 내용에서 계산해,
+    입력이 같으면 출력 bytes도 같음 (객체는 추가한 순서대로 기록되므로 순서도 고정)
+    """
+    writer = PdfWriter()
+    if cover:
+        for page in PdfReader(io.BytesIO(cover)).pages:
+            writer.add_page(page)
+
+    headings = collect_headings(sections)
+    if toc and headings:
+        with binary_streams():
+            toc_pdf = toc(headings, len(writer.pages))
+        for page in PdfReader(io.BytesIO(toc_pdf)).pages:
+            writer.add_page(page)
+
+    first_page_number = len(writer.pages) + 1
+    content_pages = []
+    for data, _meta in sections:
+        for page in PdfReader(io.BytesIO(data)).pages:
+            content_pages.append(writer.add_page(page))
+
+    if decorate_page:
+        overlay = _render_overlay(len(content_pages), decorate_page, pagesize, first_page_number)
+        for page, overlay_page in zip(content_pages, overlay.pages):
+            page.merge_page(overlay_page)
+            # merge_page는 병합된 content stream을 비압축으로 남김
+            page.compress_content_streams()
+
+    # 여러 섹션에 같은 이미지가 들어가면 섹션마다 따로 저장되므로 동일 객체를 하나로 합침
+    writer.compress_identical_objects()
+
+    if outline and headings:
+        parent = None
+        for level, title, page, top in headings:
+            item = writer.add_outline_item(title, content_pages[page], parent=parent if level else None,
+                                           fit=Fit.xyz(top=top))
+            if level == 0:
+                parent = item
+        writer.page_mode = '/UseOutlines'
+
+    stamp = pdf_date(source_date_epoch() if reproducible else time.time())
+    writer.add_metadata({'/CreationDate': stamp, '/ModDate': stamp})
+    if reproducible:
+        # 난수 대신 기록될 문서 구조의 체크섬으로 /ID 생성
+        writer.generate_file_identifiers()
+
+    if output is not None:
+        writer.write(output)
+        return output
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def bench_workers(build_story, doc_options, worker_counts, decorate_page=None, repeat=1):
+    """워커 수별 (레이아웃 + 병합) 시간과 직렬 대비 속도 향상"""
+    rows = []
+    baseline = None
+    for workers in worker_counts:
+        best = None
+        for _ in range(repeat):
+            sections = split_sections(build_story())
+            start = time.perf_counter()
+            rendered, _hits = render_sections(sections, doc_options, workers=workers)
+            pdf_bytes = assemble_pdf(None, rendered, decorate_page, doc_options.get('pagesize', A4))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        pages = sum(meta['page_count'] for _data, meta in rendered)
+        if baseline is None:
+            baseline = best
+        rows.append({
+            'workers': workers,
+            'seconds': round(best, 3),
+            'speedup': round(baseline / best, 2),
+            'pages': pages,
+            'bytes': len(pdf_bytes),
+        })
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='섹션 병렬 레이아웃 속도 측정')
+    parser.add_argument('--bench', action='store_true', help='워커 수별 속도 측정 실행')
+    parser.add_argument('--copies', type=int, default=20, help='사업 계획서 본문 반복 횟수')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.bench:
+        import create_business_plan_pdf as plan
+
+        styles = plan.get_styles()
+
+        def build_story():
+            return [f for _ in range(args.copies) for f in plan.build_content(styles) + [PageBreak()]]
+
+        print(f"CPU {os.cpu_count()}개, 본문 {args.copies}회 반복")
+        print(f"{'workers':>7} {'pages':>6} {'seconds':>8} {'speedup':>8}")
+        for row in bench_workers(build_story, plan.DOC_OPTIONS, args.workers,
+                                 plan.decorate_content_page, args.repeat):
+            print(f"{row['workers']:>7} {row['pages']:>6} {row['seconds']:>8.3f} {row['speedup']:>7.2f}x")
+    else:
+        parser.print_help()
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+스트리밍 PNG 인코더
+행(또는 여러 행 묶음)을 받는 대로 필터링해 zlib 스트림으로 압축하고 IDAT 청크로 바로 씀
+전체 이미지를 메모리에 올리지 않으므로 인쇄용 대형 이미지를 띠(strip) 단위로 쓸 수 있음
+
+    with open('poster.png', 'wb') as f, PngWriter(f, 7016, 9933, 'RGB', dpi=300) as png:
+        for strip in strips:          # (행 수, 너비, 3) uint8 배열 또는 PIL 이미지
+            png.write_rows(strip)
+
+필터는 NumPy로 띠 전체를 한 번에 계산하며, 'adaptive'는 행마다 다섯 가지 필터 중
+부호 있는 바이트 절댓값 합이 가장 작은 것을 고름 (libpng 기본 휴리스틱)
+"""
+
+import io
+import struct
+import zlib
+
+import numpy as np
+
+SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# 모드 -> (IHDR color type, 채널 수)
+COLOR_TYPES = {'L': (0, 1), 'RGB': (2, 3), 'P': (3, 1), 'LA': (4, 2), 'RGBA': (6, 4)}
+FILTERS = ('none', 'sub', 'up', 'average', 'paeth')
+ZLIB_STRATEGIES = {'default': zlib.Z_DEFAULT_STRATEGY, 'filtered': zlib.Z_FILTERED, 'rle': zlib.Z_RLE}
+IDAT_SIZE = 1 << 20
+
+
+def chunk(chunk_type, data=b''):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def pack_bits(rows, bit_depth):
+    """(행, 너비) 값 배열 -> 한 바이트에 8/bit_depth 픽셀씩 채운 (행, 바이트) 배열"""
+    if bit_depth == 8:
+        return rows
+    per_byte = 8 // bit_depth
+    height, width = rows.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = rows
+    groups = padded.reshape(height, -1, per_byte)
+    shifts = np.arange(8 - bit_depth, -1, -bit_depth, dtype=np.uint8)
+    return np.bitwise_or.reduce(groups << shifts, axis=2).astype(np.uint8)
+
+
+def _paeth(left, up, upper_left):
+    left, up, upper_left = (a.astype(np.int16) for a in (left, up, upper_left))
+    estimate = left + up - upper_left
+    pa, pb, pc = np.abs(estimate - left), np.abs(estimate - up), np.abs(estimate - upper_left)
+    return np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upper_left)).astype(np.uint8)
+
+
+def filter_rows(raw, previous, bpp, method='adaptive'):
+    """(행, 바이트) uint8 배열 -> 필터 바이트가 앞에 붙은 (행, 1 + 바이트) 배열
+
+    previous는 띠 바로 위 행(첫 띠면 0). 필터는 원본 바이트만 참조하므로 띠 전체를 벡터 연산으로 계산
+    """
+    up = np.vstack((previous[None, :], raw[:-1]))
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    upper_left = np.zeros_like(raw)
+    upper_left[:, bpp:] = up[:, :-bpp]
+
+    methods = FILTERS if method == 'adaptive' else (method,)
+    candidates = []
+    for name in methods:
+        if name == 'none':
+            candidates.append(raw)
+        elif name == 'sub':
+            candidates.append(raw - left)
+        elif name == 'up':
+            candidates.append(raw - up)
+        elif name == 'average':
+            candidates.append(raw - ((left.astype(np.uint16) + up) >> 1).astype(np.uint8))
+        elif name == 'paeth':
+            candidates.append(raw - _paeth(left, up, upper_left))
+        else:
+            raise ValueError(f"알 수 없는 필터: {name}")
+
+    if len(candidates) == 1:
+        chosen = np.full(raw.shape[0], FILTERS.index(method), dtype=np.uint8)
+        filtered = candidates[0]
+    else:
+        scores = np.stack([np.abs(c.view(np.int8), dtype=np.int16).sum(axis=1, dtype=np.int64) for c in candidates])
+        chosen = scores.argmin(axis=0).astype(np.uint8)
+        filtered = np.empty_like(raw)
+        for index, candidate in enumerate(candidates):
+            rows = chosen == index
+            filtered[rows] = candidate[rows]
+    return np.hstack((chosen[:, None], filtered))
+
+
+class PngWriter:
+    """행 단위로 받아 바로 압축해 쓰는 PNG 인코더 (비트 깊이 8, P/L은 1/2/4도 가능)"""
+
+    def __init__(self, file, width, height, mode='RGB', bit_depth=8, palette=None, transparency=None,
+                 level=6, strategy='default', filter_method='adaptive', dpi=None, extra_chunks=(),
+                 idat_size=IDAT_SIZE):
+        if mode not in COLOR_TYPES:
+            raise ValueError(f"지원하지 않는 모드: {mode}")
+        if bit_depth != 8 and mode not in ('L', 'P'):
+            raise ValueError("비트 깊이 1/2/4는 L, P 모드만 가능")
+        self.file = file
+        self.width, self.height = width, height
+        self.mode, self.bit_depth = mode, bit_depth
+        self.filter_method = filter_method
+        self.idat_size = idat_size
+        color_type, self.channels = COLOR_TYPES[mode]
+        self.bpp = max(1, self.channels * bit_depth // 8)
+        self.row_bytes = -(-width * self.channels * bit_depth // 8)
+        self.rows_written = 0
+        self._previous = np.zeros(self.row_bytes, dtype=np.uint8)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, ZLIB_STRATEGIES[strategy])
+        self._pending = []
+        self._pending_size = 0
+
+        file.write(SIGNATURE)
+        file.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0)))
+        # 색 관리(gAMA, cHRM, sRGB, iCCP) 등 PLTE/IDAT보다 앞에 와야 하는 청크
+        for chunk_type, data in extra_chunks:
+            file.write(chunk(chunk_type, data))
+        if dpi:
+            per_meter = round(dpi / 0.0254)
+            file.write(chunk(b'pHYs', struct.pack('>IIB', per_meter, per_meter, 1)))
+        if mode == 'P':
+            file.write(chunk(b'PLTE', bytes(palette)))
+        if transparency is not None:
+            file.write(chunk(b'tRNS', bytes(transparency)))
+
+    def _rows_array(self, rows):
+        if not isinstance(rows, np.ndarray):
+            if rows.mode != self.mode:
+                raise ValueError(f"모드가 다름: {rows.mode} != {self.mode}")
+            rows = np.asarray(rows)
+        rows = rows.reshape(rows.shape[0], -1) if rows.ndim == 3 else rows
+        if self.bit_depth != 8:
+            rows = pack_bits(rows, self.bit_depth)
+        if rows.shape[1] != self.row_bytes:
+            raise ValueError(f"행 길이가 다름: {rows.shape[1]} != {self.row_bytes}")
+        return np.ascontiguousarray(rows, dtype=np.uint8)
+
+    def _emit(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= self.idat_size:
+            self._flush_idat()
+
+    def _flush_idat(self):
+        if self._pending:
+            self.file.write(chunk(b'IDAT', b''.join(self._pending)))
+            self._pending, self._pending_size = [], 0
+
+    def write_rows(self, rows):
+        """(행 수, 너비[, 채널]) uint8 배열 또는 같은 모드의 PIL 이미지"""
+        raw = self._rows_array(rows)
+        if self.rows_written + raw.shape[0] > self.height:
+            raise ValueError("이미지 높이보다 많은 행")
+        filtered = filter_rows(raw, self._previous, self.bpp, self.filter_method)
+        self._previous = raw[-1].copy()
+        self.rows_written += raw.shape[0]
+        self._emit(self._compressor.compress(filtered.tobytes()))
+
+    def close(self):
+        if self.rows_written != self.height:
+            raise ValueError(f"행 수 부족: {self.rows_written}/{self.height}")
+        self._emit(self._compressor.flush())
+        self._flush_idat()
+        self.file.write(chunk(b'IEND'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+
+
+def encode_png(pixels, mode, rows_per_strip=256, **options):
+    """배열 전체 -> PNG bytes (options는 PngWriter 인자)"""
+    buffer = io.BytesIO()
+    height, width = pixels.shape[:2]
+    with PngWriter(buffer, width, height, mode, **options) as png:
+        for top in range(0, height, rows_per_strip):
+            png.write_rows(pixels[top:top + rows_per_strip])
+    return buffer.getvalue()
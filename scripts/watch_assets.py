@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+생성 파일 감시 모드
+사업 계획서 PDF와 OG 이미지의 입력(스크립트, 폰트, 부록 이미지)을 감시하다가
+변경이 멈추면(debounce) 영향받는 출력만 다시 생성하고 소요 시간을 출력
+폰트/스타일/캐시가 올라온 프로세스를 유지하고, PDF는 섹션 캐시로 바뀐 섹션만 다시 레이아웃
+
+사용법:
+    python scripts/watch_assets.py --pdf-output docs/plan.pdf --og-output public/og-image.png
+    python scripts/watch_assets.py --targets pdf --appendix-images docs/screenshots
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+import time
+import traceback
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# PDF 생성 모듈 (의존하는 모듈이 먼저 오도록 다시 불러올 순서대로)
+PDF_MODULES = ('pdf_paragraph_cache', 'pdf_korean_wrap', 'pdf_images', 'pdf_sections', 'create_business_plan_pdf')
+OG_SCRIPT = os.path.join(SCRIPTS_DIR, 'generate-og-image.py')
+
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+
+def _module_path(name):
+    return os.path.join(SCRIPTS_DIR, name + '.py')
+
+
+def _write_atomic(path, data):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PdfTarget:
+    """사업 계획서 PDF. 코드/폰트가 바뀌면 모듈을 다시 불러오고, 섹션 캐시로 바뀐 섹션만 렌더링"""
+
+    name = 'pdf'
+
+    def __init__(self, output_path=None, cache_dir=None, appendix_images=None, workers=1, reproducible=None):
+        self.plan = importlib.import_module('create_business_plan_pdf')
+        self.output_path = output_path or self.plan.OUTPUT_PATH
+        self.cache_dir = cache_dir or self.plan.SECTION_CACHE_DIR
+        self.appendix_images = appendix_images
+        self.workers = workers
+        self.reproducible = 'SOURCE_DATE_EPOCH' in os.environ if reproducible is None else reproducible
+        self.embedder = None
+
+    def _fonts(self):
+        from pdf_sections import font_fingerprint
+        return [filename for _name, filename, _size, _mtime in font_fingerprint()]
+
+    def _images(self):
+        return self.plan.collect_images(self.appendix_images) if self.appendix_images else []
+
+    def inputs(self):
+        return [_module_path(name) for name in PDF_MODULES] + self._fonts() + self._images()
+
+    def reload(self, changed):
+        """코드나 폰트가 바뀌었으면 모듈을 다시 불러옴 (폰트 재등록 포함). 이미지 변경은 해시로 처리"""
+        code_or_fonts = set(self.inputs()) - set(self._images())
+        if not changed & code_or_fonts:
+            return False
+        for name in PDF_MODULES:
+            if name in sys.modules:
+                importlib.reload(sys.modules[name])
+        self.plan = sys.modules['create_business_plan_pdf']
+        self.embedder = None
+        return True
+
+    def build(self):
+        plan = self.plan
+        content = plan.build_content
+        images = self._images()
+        if images:
+            if self.embedder is None:
+                self.embedder = plan.ImageEmbedder()
+            embedder = self.embedder
+            content = lambda styles: plan.build_content(styles) + plan.build_image_appendix(styles, images, embedder)
+        stats = {}
+        data = plan.render_pdf(content, cache_dir=self.cache_dir, workers=self.workers, stats=stats,
+                               reproducible=self.reproducible)
+        _write_atomic(self.output_path, data)
+        return (f"{self.output_path} ({stats['pages']}쪽, 섹션 재사용 {stats['cached_sections']}/{stats['sections']}, "
+                f"{len(data):,}B)")
+
+
+class OgTarget:
+    """OG 이미지. 하이픈이 들어간 스크립트 이름이라 importlib로 파일에서 직접 불러옴"""
+
+    name = 'og'
+
+    def __init__(self, output_path=None, reproducible=None):
+        self.module = self._load()
+        self.output_path = output_path or self.module.OUTPUT_PATH
+        self.reproducible = reproducible
+
+    def _load(self):
+        spec = importlib.util.spec_from_file_location('generate_og_image', OG_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def inputs(self):
+        return [OG_SCRIPT] + [path for path in self.module.KOREAN_FONTS if os.path.exists(path)]
+
+    def reload(self, changed):
+        if OG_SCRIPT in changed:
+            self.module = self._load()
+            return True
+        return False
+
+    def build(self):
+        self.module.generate_og_image(self.output_path, self.reproducible)
+        return f"{self.output_path} ({os.path.getsize(self.output_path):,}B)"
+
+
+def snapshot(paths):
+    """경로 -> (수정 시각, 크기). 저장 중 잠시 사라진 파일은 None"""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            state[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            state[path] = None
+    return state
+
+
+def _changed(before, after):
+    return {path for path in set(before) | set(after) if before.get(path) != after.get(path)}
+
+
+def rebuild(target, changed=frozenset(), detected_at=None):
+    """출력 하나 다시 생성. 실패해도(편집 중 문법 오류 등) 감시는 계속"""
+    start = time.perf_counter()
+    try:
+        reloaded = target.reload(changed) if changed else False
+        summary = target.build()
+    except Exception:
+        traceback.print_exc()
+        print(f"[{target.name}] 생성 실패 ({time.perf_counter() - start:.2f}s), 다음 변경을 기다림")
+        return False
+    end = time.perf_counter()
+    latency = f", 변경 감지 후 {end - detected_at:.2f}s" if detected_at is not None else ""
+    note = " (모듈 다시 불러옴)" if reloaded else ""
+    print(f"[{target.name}] 재생성 {end - start:.2f}s{latency}{note}: {summary}")
+    return True
+
+
+def watch(targets, interval=0.2, debounce=0.3, initial=True):
+    """입력 변경을 폴링으로 감시하고 영향받는 대상만 다시 생성 (Ctrl+C로 종료)"""
+    if initial:
+        for target in targets:
+            rebuild(target)
+    state = snapshot({path for target in targets for path in target.inputs()})
+    print(f"감시 중: 입력 파일 {len(state)}개 (폴링 {interval}s, debounce {debounce}s)")
+
+    while True:
+        time.sleep(interval)
+        current = snapshot(state)
+        changed = _changed(state, current)
+        if not changed:
+            continue
+        detected_at = time.perf_counter()
+
+        # 연속 저장(에디터 임시 파일, 여러 파일 일괄 변경)이 끝날 때까지 대기
+        quiet_since = detected_at
+        while time.perf_counter() - quiet_since < debounce:
+            time.sleep(interval)
+            latest = snapshot(state)
+            more = _changed(current, latest)
+            if more:
+                changed |= more
+                quiet_since = time.perf_counter()
+            current = latest
+
+        names = ', '.join(sorted(os.path.basename(path) for path in changed))
+        print(f"변경: {names}")
+        for target in targets:
+            if changed & set(target.inputs()):
+                rebuild(target, changed, detected_at)
+        # 다시 불러온 뒤 입력 목록(폰트, 부록 이미지)이 바뀌었을 수 있음
+        state = snapshot({path for target in targets for path in target.inputs()})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='PDF/OG 이미지 감시 모드')
+    parser.add_argument('--targets', nargs='+', choices=('pdf', 'og'), default=['pdf', 'og'])
+    parser.add_argument('--pdf-output', help='PDF 출력 경로 (기본: create_business_plan_pdf.OUTPUT_PATH)')
+    parser.add_argument('--og-output', help='OG 이미지 출력 경로 (기본: generate-og-image.py의 OUTPUT_PATH)')
+    parser.add_argument('--cache-dir', help='섹션 캐시 디렉터리')
+    parser.add_argument('--appendix-images', nargs='+', metavar='PATH', help='PDF 부록 이미지 파일/디렉터리')
+    parser.add_argument('--workers', type=int, default=1, help='섹션 병렬 레이아웃 프로세스 수')
+    parser.add_argument('--reproducible', action='store_true', default=None,
+                        help='시각/문서 ID 고정, PNG 메타데이터 제거 (SOURCE_DATE_EPOCH가 있으면 기본 적용)')
+    parser.add_argument('--interval', type=float, default=0.2, help='폴링 간격 (초)')
+    parser.add_argument('--debounce', type=float, default=0.3, help='마지막 변경 후 대기 시간 (초)')
+    parser.add_argument('--no-initial', action='store_true', help='시작할 때 한 번 생성하지 않음')
+    args = parser.parse_args()
+
+    targets = []
+    if 'pdf' in args.targets:
+        targets.append(PdfTarget(args.pdf_output, args.cache_dir, args.appendix_images, args.workers,
+                                 args.reproducible))
+    if 'og' in args.targets:
+        targets.append(OgTarget(args.og_output, args.reproducible))
+    try:
+        watch(targets, args.interval, args.debounce, not args.no_initial)
+    except KeyboardInterrupt:
+        print("감시 종료")